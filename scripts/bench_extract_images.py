@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for extract_images URL extraction.
+
+Compares the streaming ImageURLScanner used by extract_images against the
+previous BeautifulSoup implementation (full tree + find_all + per-element
+regex) on the cached Google Sites HTML.
+
+Usage:
+    python3 scripts/bench_extract_images.py [--repeat N] [HTML_FILE ...]
+
+With no files the corpus is .cache/google_site/*.html, falling back to
+docs/reference-shots/home.html plus synthetic fixture_site.py pages.
+
+Requirements: Python 3.12+, beautifulsoup4; optional: lxml
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Callable
+
+from bs4 import BeautifulSoup
+
+from extract_images import GOOGLEUSERCONTENT_PATTERN, extract_image_urls_from_html
+from fixture_site import render_page
+from html_backend import available_backends
+
+CACHE_DIR = Path(".cache/google_site")
+REFERENCE_HTML = Path("docs/reference-shots/home.html")
+FIXTURE_PAGES = 5
+
+
+def load_corpus(paths: list[str]) -> dict[str, str]:
+    """Return name -> HTML for the files to benchmark."""
+    files = [Path(path) for path in paths] or sorted(CACHE_DIR.glob("*.html"))
+    if files:
+        return {str(path): path.read_text(encoding="utf-8") for path in files}
+
+    corpus = {f"fixture page {index}": render_page(index, FIXTURE_PAGES) for index in range(FIXTURE_PAGES)}
+    if REFERENCE_HTML.exists():
+        corpus[str(REFERENCE_HTML)] = REFERENCE_HTML.read_text(encoding="utf-8")
+    return corpus
+
+
+def extract_with_beautifulsoup(html_content: str, builder: str) -> list[str]:
+    """The pre-scanner implementation, kept here as the baseline."""
+    soup = BeautifulSoup(html_content, builder)
+    image_urls = []
+    for img in soup.find_all("img"):
+        src = img.get("src")
+        if src and GOOGLEUSERCONTENT_PATTERN.match(src):
+            image_urls.append(src)
+    for element in soup.find_all(style=True):
+        style = element.get("style", "")
+        image_urls.extend(re.findall(r'url\(["\']?(https://lh\d+\.googleusercontent\.com/[^"\')\s]+)["\']?\)', style))
+    return image_urls
+
+
+def time_extractor(extract: Callable[[str], list[str]], documents: list[str], repeat: int) -> tuple[float, int]:
+    """Return (best seconds per corpus pass, URLs found)."""
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = sum(len(extract(html)) for html in documents)
+        best = min(best, time.perf_counter() - started)
+    return best, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark image URL extraction")
+    parser.add_argument("files", nargs="*", help="HTML files (default: cached pages)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes; the best is reported (default: 5)")
+    args = parser.parse_args()
+
+    documents = list(load_corpus(args.files).values())
+    megabytes = sum(len(html.encode("utf-8")) for html in documents) / 1e6
+
+    extractors: dict[str, Callable[[str], list[str]]] = {
+        "beautifulsoup (html.parser)": lambda html: extract_with_beautifulsoup(html, "html.parser"),
+    }
+    if "lxml" in available_backends():
+        extractors["beautifulsoup (lxml)"] = lambda html: extract_with_beautifulsoup(html, "lxml")
+    extractors["streaming scanner"] = extract_image_urls_from_html
+
+    print(f"Corpus: {len(documents)} document(s), {megabytes:.2f} MB, best of {args.repeat}")
+    baseline = None
+    for name, extract in extractors.items():
+        seconds, found = time_extractor(extract, documents, args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms  {megabytes / seconds:7.1f} MB/s  "
+              f"{baseline / seconds:5.1f}x  ({found} URLs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the migration scripts.
+
+Times every pipeline stage against recorded fixtures served by a local HTTP
+stand-in (fixture_site.py), never the live site:
+
+- crawl_site: crawl a synthetic --pages page site
+- import_serial: import the recorded site pages one after another,
+  downloading their images (the baseline for import_pages)
+- import_pages: the same through the pipelined import at its defaults
+- scan_cache_for_images.cold / .warm: scan a cache holding the recorded
+  pages plus the synthetic site, without and with image-scan.json
+- MirrorPostprocessor.run: stage and rewrite a wget-style mirror of both
+- reorganize_images.main: sniff, hash and sort an imported image tree
+
+The recorded corpus lives in scripts/fixtures/google_site/<slug>.html and is
+snapshotted from .cache/google_site/ with --record. Without it, the eight
+site pages are docs/reference-shots/home.html plus synthetic pages.
+
+Every pass runs in a fresh temporary directory with the scripts' output
+directories pointed into it. Results (best and median seconds per
+benchmark) are written to .benchmarks/<time>-<commit>.json; --compare
+checks them against an earlier result, by default the newest one, and
+exits 1 when a benchmark got slower than --threshold.
+
+Usage:
+    python3 scripts/bench_pipeline.py [--pages 1000] [--repeat 3] [--only NAME ...] [--compare [FILE]]
+    python3 scripts/bench_pipeline.py --record
+
+Requirements: Python 3.12+, requests, beautifulsoup4, markdownify
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import crawl_inventory
+import extract_images
+import import_google_site
+import reorganize_images
+from cache_index import CacheIndex, cache_filename, content_sha256
+from fixture_site import fixture_image, render_page, serve_fixture_site, serve_recorded_site
+from postprocess_mirror import MirrorPostprocessor
+
+FIXTURE_DIR = Path("scripts/fixtures/google_site")
+RESULTS_DIR = Path(".benchmarks")
+REFERENCE_HTML = Path("docs/reference-shots/home.html")
+SITE_PAGES = ("home", "our-team", "wei-chen", "research", "facilities", "contact", "links", "publications")
+DEFAULT_PAGES = 1000
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25  # slowdown (best vs. best) reported as a regression
+CRAWL_CONCURRENCY = 8
+RESULTS_VERSION = 1
+
+
+class Fixtures:
+    """Inputs shared by all benchmarks: the page corpus and the stand-in servers."""
+
+    def __init__(self, corpus: dict[str, str], page_count: int, site_url: str, recorded_url: str) -> None:
+        self.corpus = corpus  # slug -> HTML of the site pages
+        self.page_count = page_count  # size of the synthetic site
+        self.site_url = site_url
+        self.recorded_url = recorded_url
+
+    def synthetic_pages(self) -> Iterator[tuple[str, str]]:
+        for index in range(self.page_count):
+            yield f"page-{index}", render_page(index, self.page_count)
+
+    def all_pages(self) -> Iterator[tuple[str, str]]:
+        yield from self.corpus.items()
+        yield from self.synthetic_pages()
+
+
+Benchmark = Callable[[Fixtures, Path], Callable[[], int]]
+
+
+def record_fixtures(cache_dir: Path = import_google_site.CACHE_DIR) -> int:
+    """Copy every indexed page in the HTML cache into FIXTURE_DIR as <slug>.html."""
+    index = CacheIndex(cache_dir)
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    recorded = 0
+    for entry in index.entries.values():
+        cache_file = cache_dir / entry["file"]
+        if cache_file.exists():
+            shutil.copyfile(cache_file, FIXTURE_DIR / f"{entry['slug']}.html")
+            recorded += 1
+    return recorded
+
+
+def load_fixtures() -> tuple[dict[str, str], bool]:
+    """Return the site pages (slug -> HTML) and whether they were recorded."""
+    recorded = {path.stem: path.read_text(encoding="utf-8") for path in sorted(FIXTURE_DIR.glob("*.html"))}
+    if recorded:
+        return recorded, True
+
+    corpus = {slug: render_page(index, len(SITE_PAGES)) for index, slug in enumerate(SITE_PAGES)}
+    if REFERENCE_HTML.exists():
+        corpus["home"] = REFERENCE_HTML.read_text(encoding="utf-8")
+    return corpus, False
+
+
+def write_cache(cache_dir: Path, pages: Iterator[tuple[str, str]]) -> None:
+    """Lay pages out as an indexed import_google_site.py cache."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index = CacheIndex(cache_dir)
+    for slug, html in pages:
+        url = import_google_site.BASE_URL if slug == "home" else f"{import_google_site.BASE_URL}/{slug}"
+        (cache_dir / cache_filename(url)).write_text(html, encoding="utf-8")
+        index.record(url, fetched_at=time.time(), etag=None, last_modified=None, content_sha256=content_sha256(html))
+
+
+def write_mirror(raw_dir: Path, fixtures: Fixtures) -> None:
+    """Lay pages out like a wget mirror, with one image and a stylesheet."""
+    site_dir = raw_dir / "sites.google.com" / "view" / "msdsoftmatter"
+    image_dir = raw_dir / "lh3.googleusercontent.com" / "sitesv"
+    site_dir.mkdir(parents=True)
+    image_dir.mkdir(parents=True)
+    for slug, html in fixtures.all_pages():
+        (site_dir / f"{slug}.html").write_text(html, encoding="utf-8")
+    for index in range(fixtures.page_count):
+        (image_dir / f"FIXTURE{index:04d}.png").write_bytes(fixture_image(f"FIXTURE{index:04d}"))
+    (raw_dir / "sites.google.com" / "site.css").write_text(
+        ".hero { background-image: url('../lh3.googleusercontent.com/sitesv/FIXTURE0000.png'); }\n",
+        encoding="utf-8",
+    )
+
+
+def write_imported_images(base_dir: Path, image_count: int) -> None:
+    """Fill assets/img/imported/<page>/ like import_google_site.py does.
+
+    Every tenth file repeats the previous one's content and every fiftieth is
+    an HTML error page, so deduplication and validation are exercised too.
+    """
+    for index in range(image_count):
+        folder = base_dir / "imported" / SITE_PAGES[index % len(SITE_PAGES)]
+        folder.mkdir(parents=True, exist_ok=True)
+        if index % 50 == 49:
+            body = b"<!DOCTYPE html><html><body>Not Found</body></html>"
+        else:
+            body = fixture_image(f"image-{index - 1 if index % 10 == 9 else index}")
+        (folder / f"AAzXCk{index:05d}").write_bytes(body)
+
+
+def bench_crawl_site(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    def run() -> int:
+        pages, _ = crawl_inventory.crawl_site(fixtures.site_url, concurrency=CRAWL_CONCURRENCY, rate=0)
+        return len(pages)
+
+    return run
+
+
+def import_targets(fixtures: Fixtures, workdir: Path) -> list[tuple[str, str]]:
+    """Point import_google_site.py into workdir and return the recorded (slug, URL) pages."""
+    import_google_site.CACHE_DIR = workdir / "cache"
+    import_google_site.PAGES_DIR = workdir / "pages"
+    import_google_site.ASSETS_DIR = workdir / "assets"
+    import_google_site.get_engine(rate=0)
+    return [(slug, fixtures.recorded_url + ("" if slug == "home" else slug)) for slug in fixtures.corpus]
+
+
+def bench_import_serial(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    targets = import_targets(fixtures, workdir)
+
+    def run() -> int:
+        for slug, url in targets:
+            prepared = import_google_site.prepare_page(url, slug, force=False)
+            if prepared:
+                import_google_site.finish_page(url, slug, *prepared, force=False)
+        return len(targets)
+
+    return run
+
+
+def bench_import_pages(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    targets = import_targets(fixtures, workdir)
+    journal = import_google_site.RunJournal.start(workdir / "journal.jsonl", {})
+
+    def run() -> int:
+        import_google_site.import_pages(targets, False, journal)
+        return len(targets)
+
+    return run
+
+
+def bench_scan_cold(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    extract_images.CACHE_DIR = workdir / "cache"
+    write_cache(extract_images.CACHE_DIR, fixtures.all_pages())
+    return lambda: len(extract_images.scan_cache_for_images())
+
+
+def bench_scan_warm(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    run = bench_scan_cold(fixtures, workdir)
+    run()  # leaves image-scan.json behind
+    return run
+
+
+def bench_postprocess(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    write_mirror(workdir / "raw", fixtures)
+    processor = MirrorPostprocessor(workdir / "raw", workdir / "staging", jobs=os.cpu_count() or 1)
+
+    def run() -> int:
+        processor.run()
+        return len(processor.asset_map)
+
+    return run
+
+
+def bench_reorganize(fixtures: Fixtures, workdir: Path) -> Callable[[], int]:
+    write_imported_images(workdir, fixtures.page_count)
+    return lambda: len(reorganize_images.main(workdir)["images"])
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "crawl_site": bench_crawl_site,
+    "import_serial": bench_import_serial,
+    "import_pages": bench_import_pages,
+    "scan_cache_for_images.cold": bench_scan_cold,
+    "scan_cache_for_images.warm": bench_scan_warm,
+    "MirrorPostprocessor.run": bench_postprocess,
+    "reorganize_images.main": bench_reorganize,
+}
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Swallow the scripts' progress output (prints and log records below WARNING)."""
+    logging.disable(logging.INFO)
+    try:
+        with redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def measure(benchmark: Benchmark, fixtures: Fixtures, repeat: int) -> dict[str, Any]:
+    """Time ``repeat`` passes, each set up untimed in a fresh temporary directory."""
+    runs = []
+    items = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="bench-") as tmp, quiet():
+            run = benchmark(fixtures, Path(tmp))
+            started = time.perf_counter()
+            items = run()
+            runs.append(time.perf_counter() - started)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": runs, "items": items}
+
+
+def git_revision() -> tuple[Optional[str], bool]:
+    """Short HEAD commit and whether tracked files have uncommitted changes."""
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return head.stdout.strip(), bool(status.stdout.strip())
+
+
+def latest_result(exclude: Optional[Path] = None) -> Optional[Path]:
+    results = sorted(path for path in RESULTS_DIR.glob("*.json") if path != exclude)
+    return results[-1] if results else None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print best-time ratios against ``baseline``; return the regressed benchmarks."""
+    print(f"\nCompared with {baseline.get('commit') or 'unknown commit'} ({baseline.get('created')}):")
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before:
+            print(f"  {name:<28} (no baseline)")
+            continue
+        ratio = result["best"] / before["best"]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28} {before['best'] * 1000:9.1f} ms -> {result['best'] * 1000:9.1f} ms  "
+              f"{ratio:5.2f}x{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the migration scripts against local fixtures")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES,
+                        help=f"Size of the synthetic site (default: {DEFAULT_PAGES})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Timed passes per benchmark; best and median are kept (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, metavar="NAME",
+                        help=f"Run only these benchmarks: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS",
+                        help="Artificial delay per stand-in HTTP request")
+    parser.add_argument("--output", type=Path, default=None,
+                        help=f"Result file (default: {RESULTS_DIR}/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs="?", type=Path, const=Path("latest"), default=None, metavar="FILE",
+                        help="Compare with an earlier result (default: the newest in the results directory)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Slowdown reported as a regression, as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--record", action="store_true",
+                        help=f"Snapshot the cached pages into {FIXTURE_DIR} and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        recorded = record_fixtures()
+        print(f"Recorded {recorded} page(s) into {FIXTURE_DIR}")
+        return 0 if recorded else 1
+
+    baseline_path = latest_result() if args.compare == Path("latest") else args.compare
+    corpus, recorded = load_fixtures()
+    commit, dirty = git_revision()
+    created = datetime.now(timezone.utc)
+    print(f"Fixtures: {len(corpus)} {'recorded' if recorded else 'stand-in'} site page(s), "
+          f"{args.pages} synthetic page(s), best of {args.repeat}")
+
+    result: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "commit": commit,
+        "dirty": dirty,
+        "created": created.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "fixtures": {"recorded": recorded, "site_pages": len(corpus), "synthetic_pages": args.pages},
+        "repeat": args.repeat,
+        "benchmarks": {},
+    }
+
+    with ExitStack() as servers:
+        fixtures = Fixtures(
+            corpus,
+            args.pages,
+            site_url=servers.enter_context(serve_fixture_site(args.pages, args.latency)),
+            recorded_url=servers.enter_context(serve_recorded_site(corpus, args.latency)),
+        )
+        for name in args.only or BENCHMARKS:
+            timing = measure(BENCHMARKS[name], fixtures, args.repeat)
+            result["benchmarks"][name] = timing
+            print(f"  {name:<28} {timing['best'] * 1000:9.1f} ms best  "
+                  f"{timing['median'] * 1000:9.1f} ms median  ({timing['items']} items)")
+
+    output = args.output or RESULTS_DIR / f"{created:%Y%m%dT%H%M%S}-{commit or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if baseline_path is None:
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline to compare with ({baseline_path})")
+        return 0
+    regressions = compare(result, json.loads(baseline_path.read_text(encoding="utf-8")), args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Responsive image build stage for the Jekyll site.
+
+Reads the image manifest written by reorganize_images.py (or scans
+assets/img/{team,research,facilities,general} when no manifest exists),
+encodes width-bucketed AVIF/WebP/JPEG derivatives in parallel across cores,
+and writes _data/responsive_images.json for _includes/responsive-image.html
+to render <picture> srcset/sizes markup.
+
+Derivatives live under assets/img/responsive/<key>/, where <key> hashes the
+source content together with the encoding settings, so unchanged images are
+never re-encoded and stale outputs are pruned.
+
+Usage:
+    python3 scripts/build_responsive_images.py [--jobs N]
+
+Requirements: Python 3.12+, Pillow (AVIF output needs Pillow built with AVIF support)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from profiling import add_profile_arguments, start_profile
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+
+# Constants
+IMG_DIR = Path("assets/img")
+MANIFEST_PATH = IMG_DIR / "image-manifest.json"
+OUTPUT_DIR = IMG_DIR / "responsive"
+DATA_FILE = Path("_data/responsive_images.json")
+CATEGORIES = ("team", "research", "facilities", "general")
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+QUALITY = {"avif": 50, "webp": 75, "jpeg": 80, "png": None}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+PIPELINE_VERSION = 2  # bump to force every derivative to be re-encoded
+RECORD_NAME = "derivatives.json"
+
+
+def file_blake2b(path: Path) -> str:
+    """Stream a file through BLAKE2b (same content hash as reorganize_images)."""
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=32)).hexdigest()
+
+
+def collect_sources() -> list[tuple[str, Path, str]]:
+    """Return (site path, file path, content hash) for every source image."""
+    sources = []
+    if MANIFEST_PATH.exists():
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        for image in manifest["images"]:
+            path = IMG_DIR / image["new_path"]
+            content_hash = image.get("content_hash", "").removeprefix("blake2b:")
+            sources.append((path, content_hash))
+    else:
+        for category in CATEGORIES:
+            sources.extend((path, "") for path in sorted((IMG_DIR / category).glob("*")))
+
+    return [
+        (f"/{path.as_posix()}", path, content_hash or file_blake2b(path))
+        for path, content_hash in sources
+        if path.suffix.lower() in SOURCE_SUFFIXES and path.exists()
+    ]
+
+
+def output_formats() -> list[str]:
+    """Modern formats this Pillow build can encode, best first."""
+    formats = ["webp"] if features.check("webp") else []
+    if features.check("avif"):
+        formats.insert(0, "avif")
+    return formats
+
+
+def derivative_key(content_hash: str, formats: list[str]) -> str:
+    """Cache key covering the source content and every encoding setting."""
+    settings = json.dumps([content_hash, PIPELINE_VERSION, WIDTHS, QUALITY, formats])
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_derivatives(source: Path, out_dir: Path, formats: list[str]) -> dict:
+    """Encode every width bucket of one image and return its srcset record."""
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    fallback = "png" if has_alpha else "jpeg"
+    largest = min(image.width, WIDTHS[-1])
+    widths = [width for width in WIDTHS if width < largest] + [largest]
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    srcsets: dict[str, list[str]] = {fmt: [] for fmt in [*formats, fallback]}
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in srcsets:
+            filename = f"{width}.{'jpg' if fmt == 'jpeg' else fmt}"
+            options = {"quality": QUALITY[fmt]} if QUALITY[fmt] else {"optimize": True}
+            resized.save(tmp_dir / filename, fmt.upper(), **options)
+            srcsets[fmt].append(f"/{(out_dir / filename).as_posix()} {width}w")
+
+    record = {
+        "width": largest,
+        "height": round(image.height * largest / image.width),
+        "sources": [{"type": MIME_TYPES[fmt], "srcset": ", ".join(srcsets[fmt])} for fmt in formats],
+        "fallback": srcsets[fallback][-1].rsplit(" ", 1)[0],
+        "fallback_srcset": ", ".join(srcsets[fallback]),
+    }
+    (tmp_dir / RECORD_NAME).write_text(json.dumps(record, indent=2), encoding="utf-8")
+
+    # The record is written last and the directory renamed into place, so a
+    # directory with a record is always a complete, reusable set.
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return record
+
+
+def build(jobs: int | None) -> dict[str, dict]:
+    """Encode missing derivatives and return the site path -> record map."""
+    formats = output_formats()
+    records: dict[str, dict] = {}
+    # Sources with identical content share one derivative directory, so each
+    # directory is encoded by exactly one job: out_dir -> (source, site paths)
+    pending: dict[Path, tuple[Path, list[str]]] = {}
+
+    for site_path, path, content_hash in collect_sources():
+        out_dir = OUTPUT_DIR / derivative_key(content_hash, formats)
+        record_path = out_dir / RECORD_NAME
+        if record_path.exists():
+            records[site_path] = json.loads(record_path.read_text(encoding="utf-8"))
+        else:
+            pending.setdefault(out_dir, (path, []))[1].append(site_path)
+
+    print(f"{len(records)} image(s) cached, {len(pending)} to encode ({', '.join(formats + ['jpeg/png'])})")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            out_dir: pool.submit(encode_derivatives, path, out_dir, formats)
+            for out_dir, (path, _) in pending.items()
+        }
+        for out_dir, future in futures.items():
+            site_paths = pending[out_dir][1]
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"  Warning: Failed to encode {', '.join(site_paths)}: {e}")
+                continue
+            for site_path in site_paths:
+                records[site_path] = record
+                print(f"  Encoded: {site_path}")
+
+    prune_outputs({Path(record["fallback"]).parent.name for record in records.values()})
+    return dict(sorted(records.items()))
+
+
+def prune_outputs(keep: set[str]) -> None:
+    """Remove derivative directories no current source maps to."""
+    if not OUTPUT_DIR.exists():
+        return
+    for entry in OUTPUT_DIR.iterdir():
+        if entry.is_dir() and entry.name not in keep:
+            shutil.rmtree(entry)
+            print(f"  Pruned: {entry}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build responsive image derivatives and srcset data")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Encoder processes (default: number of CPUs)"
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profile(args, "build_responsive_images")
+
+    if Image is None:
+        print("Error: Pillow is required (pip install -r scripts/requirements.txt)")
+        sys.exit(1)
+
+    records = build(args.jobs)
+
+    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+    DATA_FILE.write_text(json.dumps(records, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {len(records)} entries to {DATA_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Metadata index for the Google Sites HTML cache.
+
+Every page cached under .cache/google_site/<sha256(url)>.html has a record
+in .cache/google_site/index.jsonl holding its URL, page slug, fetch time,
+HTTP validators and content hash. The file is append-only (one JSON object
+per line, last record per file wins) so concurrent writers never clobber
+each other; it is compacted on load once superseded lines pile up.
+Validators left in per-page ``<sha256>.json`` sidecars by older importer
+versions are folded into the index on load and the sidecars removed.
+
+import_google_site.py writes the index as it fetches; extract_images.py
+reads it to map cache files to pages without a hard-coded table.
+
+Requirements: Python 3.12+
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+INDEX_NAME = "index.jsonl"
+SITE_ROOT_PATH = "view/msdsoftmatter"
+ROOT_SLUG = "base"  # name the old hard-coded page table gave the site root
+
+
+def cache_filename(url: str) -> str:
+    """Name of the cache file holding ``url``."""
+    return f"{hashlib.sha256(url.encode()).hexdigest()}.html"
+
+
+def content_sha256(html: str) -> str:
+    """Hash of the cached page body."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def slug_for_url(url: str, root_slug: str = ROOT_SLUG) -> str:
+    """Page slug for a site URL; the site root gets ``root_slug``.
+
+    The root and /home are separate cache entries, so the index keeps them
+    apart as "base" and "home"; the importer publishes the root as "home".
+    """
+    page_path = urlparse(url).path.strip("/")
+    if not page_path or page_path == SITE_ROOT_PATH:
+        return root_slug
+    slug = page_path.split("/")[-1].lower().strip()
+    slug = re.sub(r"[^\w\s-]", "", slug)
+    return re.sub(r"[-\s]+", "-", slug).strip("-")
+
+
+class CacheIndex:
+    """In-memory view of index.jsonl with O(1) lookups by cache file or URL."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self.path = cache_dir / INDEX_NAME
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._migrate_sidecars()
+
+    def _load(self) -> None:
+        lines = 0
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from an interrupted run
+                    self.entries[entry["file"]] = entry
+        except FileNotFoundError:
+            return
+        if lines > 2 * len(self.entries) + 16:
+            self.compact()
+
+    def _migrate_sidecars(self) -> None:
+        """Move validators from legacy ``<sha256>.json`` sidecars into the index."""
+        for sidecar in self.cache_dir.glob("*.json"):
+            try:
+                meta = json.loads(sidecar.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            url = meta.get("url") if isinstance(meta, dict) else None
+            if not url or cache_filename(url) != f"{sidecar.stem}.html":
+                continue  # not a page sidecar (image-scan.json, journals, ...)
+            cache_file = self.cache_dir / cache_filename(url)
+            if cache_file.exists() and cache_file.name not in self.entries:
+                self.record(
+                    url,
+                    fetched_at=meta.get("fetched_at", cache_file.stat().st_mtime),
+                    etag=meta.get("etag"),
+                    last_modified=meta.get("last_modified"),
+                    content_sha256=content_sha256(cache_file.read_text(encoding="utf-8")),
+                )
+            sidecar.unlink()
+
+    def get(self, filename: str) -> dict | None:
+        """Entry for a cache file name (``<sha256>.html``)."""
+        return self.entries.get(filename)
+
+    def lookup(self, url: str) -> dict | None:
+        """Entry for a page URL."""
+        return self.entries.get(cache_filename(url))
+
+    def record(self, url: str, **fields) -> dict:
+        """Append (and return) the current metadata for ``url``."""
+        entry = {"file": cache_filename(url), "url": url, "slug": slug_for_url(url), **fields}
+        line = json.dumps(entry, sort_keys=True) + "\n"
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line)
+            self.entries[entry["file"]] = entry
+        return entry
+
+    def compact(self) -> None:
+        """Rewrite the index with one line per cache file."""
+        with self._lock:
+            tmp_path = self.path.with_suffix(".jsonl.tmp")
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                for entry in self.entries.values():
+                    fh.write(json.dumps(entry, sort_keys=True) + "\n")
+            os.replace(tmp_path, self.path)
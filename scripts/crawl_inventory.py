@@ -1,96 +1,139 @@
+import argparse
 import json
 import time
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urldefrag, urljoin
 
-import requests
-from bs4 import BeautifulSoup
+from fetch_engine import DEFAULT_RATE, FetchEngine
+from html_backend import parse_html
+from metrics import count, timer, write_metrics_at_exit
+from profiling import add_profile_arguments, start_profile
 
 
 START_URL = "https://sites.google.com/view/msdsoftmatter/"
 OUTPUT_DIR = Path("docs")
 
 
-def normalize_internal(url: str) -> Optional[str]:
+def normalize_internal(url: str, start_url: str = START_URL) -> Optional[str]:
     """Keep only URLs that belong to the site and strip fragments/query."""
     clean, _ = urldefrag(url)
-    if not clean.startswith(START_URL):
+    if not clean.startswith(start_url):
         return None
     if clean.endswith("#"):
         clean = clean[:-1]
     return clean
 
 
-def crawl_site() -> tuple[list[dict], set[str]]:
-    session = requests.Session()
-    visited: set[str] = set()
-    queue: deque[str] = deque([START_URL])
-    pages: list[dict] = []
+def parse_page(url: str, html: str, start_url: str) -> tuple[dict, set[str], list[str]]:
+    """Extract the page record, asset URLs and internal links from one page."""
+    soup = parse_html(html)
+    title = (soup.title.string or "").strip() if soup.title else ""
+    sections = [sec.get("id") for sec in soup.select("section[id]")]
+    excerpt = " ".join(sec.get_text(" ", strip=True) for sec in soup.select("section"))[:400]
+    page = {
+        "url": url,
+        "title": title,
+        "sections": [s for s in sections if s],
+        "excerpt": excerpt,
+    }
     assets: set[str] = set()
+    links: list[str] = []
 
-    while queue:
-        current = queue.popleft()
-        if current in visited:
-            continue
+    for img in soup.select("img[src]"):
+        assets.add(urldefrag(img["src"])[0])
 
-        try:
-            resp = session.get(current, timeout=30)
-            resp.raise_for_status()
-        except Exception as exc:  # noqa: BLE001
-            print(f"FAILED {current}: {exc}")
-            visited.add(current)
+    for el in soup.select('[style*="background-image"]'):
+        style = el.get("style", "")
+        if "url(" in style:
+            fragment = style.split("url(", 1)[1].split(")", 1)[0].strip("\"' ")
+            if fragment:
+                assets.add(urldefrag(fragment)[0])
+
+    for link in soup.select("a[href]"):
+        href = link["href"].strip()
+        if not href:
             continue
+        if href.startswith("http"):
+            if href.startswith(start_url):
+                internal = normalize_internal(href, start_url)
+                if internal:
+                    links.append(internal)
+            else:
+                assets.add(urldefrag(href)[0])
+        elif href.startswith("/"):
+            internal = normalize_internal(urljoin(url, href), start_url)
+            if internal:
+                links.append(internal)
+
+    return page, assets, links
+
+
+def fetch_page(
+    engine: FetchEngine, url: str, start_url: str
+) -> Optional[tuple[dict, set[str], list[str]]]:
+    """Fetch and parse one page under the politeness budget; None on failure."""
+    try:
+        with timer("fetch"):
+            resp = engine.get(url)
+            resp.raise_for_status()
+            count("bytes_fetched", len(resp.content))
+    except Exception as exc:  # noqa: BLE001
+        print(f"FAILED {url}: {exc}")
+        count("pages_failed")
+        return None
+    with timer("parse"):
+        return parse_page(url, resp.text, start_url)
 
-        visited.add(current)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        title = (soup.title.string or "").strip() if soup.title else ""
-        sections = [sec.get("id") for sec in soup.select("section[id]")]
-        excerpt = " ".join(sec.get_text(" ", strip=True) for sec in soup.select("section"))[:400]
-        pages.append({
-            "url": current,
-            "title": title,
-            "sections": [s for s in sections if s],
-            "excerpt": excerpt,
-        })
-
-        for img in soup.select("img[src]"):
-            assets.add(urldefrag(img["src"])[0])
-
-        for el in soup.select('[style*="background-image"]'):
-            style = el.get("style", "")
-            if "url(" in style:
-                fragment = style.split("url(", 1)[1].split(")", 1)[0].strip("\"' ")
-                if fragment:
-                    assets.add(urldefrag(fragment)[0])
-
-        for link in soup.select("a[href]"):
-            href = link["href"].strip()
-            if not href:
-                continue
-            if href.startswith("http"):
-                if href.startswith(START_URL):
-                    internal = normalize_internal(href)
-                    if internal and internal not in visited:
-                        queue.append(internal)
-                else:
-                    assets.add(urldefrag(href)[0])
-            elif href.startswith("/"):
-                internal = normalize_internal(urljoin(current, href))
-                if internal and internal not in visited:
-                    queue.append(internal)
 
-        time.sleep(0.4)
+def crawl_site(
+    start_url: str = START_URL,
+    concurrency: int = 1,
+    rate: float = DEFAULT_RATE,
+) -> tuple[list[dict], set[str]]:
+    """Breadth-first crawl of the site with up to ``concurrency`` fetches in flight.
+
+    The set of pages reached does not depend on completion order, and results
+    are sorted before returning, so output is identical for any concurrency.
+    """
+    concurrency = max(1, concurrency)
+    engine = FetchEngine(rate=rate, pool_size=concurrency)
+
+    scheduled: set[str] = {start_url}
+    queue: deque[str] = deque([start_url])
+    pages: list[dict] = []
+    assets: set[str] = set()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight: set[Future] = set()
+        while queue or in_flight:
+            while queue and len(in_flight) < concurrency:
+                url = queue.popleft()
+                in_flight.add(pool.submit(fetch_page, engine, url, start_url))
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is None:
+                    continue
+                page, page_assets, links = result
+                pages.append(page)
+                assets.update(page_assets)
+                for internal in links:
+                    if internal not in scheduled:
+                        scheduled.add(internal)
+                        queue.append(internal)
 
     pages.sort(key=lambda item: item["url"])
     return pages, assets
 
 
-def write_outputs(pages: list[dict], assets: set[str]) -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    site_map = OUTPUT_DIR / "site-map.json"
-    inventory_md = OUTPUT_DIR / "inventory.md"
+def write_outputs(pages: list[dict], assets: set[str], output_dir: Path = OUTPUT_DIR) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    site_map = output_dir / "site-map.json"
+    inventory_md = output_dir / "inventory.md"
 
     with site_map.open("w", encoding="utf-8") as fh:
         json.dump({"pages": pages, "assets": sorted(assets)}, fh, indent=2)
@@ -111,9 +154,41 @@ def write_outputs(pages: list[dict], assets: set[str]) -> None:
 
 
 def main() -> None:
-    pages, assets = crawl_site()
-    print(f"Crawled {len(pages)} pages and discovered {len(assets)} unique assets")
-    write_outputs(pages, assets)
+    parser = argparse.ArgumentParser(description="Crawl the Google Site and write docs/site-map.json + inventory.md")
+    parser.add_argument("--start-url", default=START_URL, help=f"Site root to crawl (default: {START_URL})")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of pages fetched in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        metavar="RPS",
+        help=f"Politeness budget in requests per second per host, 0 = unlimited (default: {DEFAULT_RATE})",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write per-phase timings and counters (bytes, retries) to PATH at exit",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    write_metrics_at_exit(args.metrics_json, "crawl_inventory")
+    start_profile(args, "crawl_inventory")
+
+    started = time.monotonic()
+    pages, assets = crawl_site(args.start_url, concurrency=args.concurrency, rate=args.rate)
+    elapsed = time.monotonic() - started
+    print(f"Crawled {len(pages)} pages and discovered {len(assets)} unique assets in {elapsed:.1f}s")
+    with timer("write"):
+        write_outputs(pages, assets, args.output_dir)
 
 
 if __name__ == "__main__":
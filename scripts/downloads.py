@@ -0,0 +1,124 @@
+"""
+Streaming, resumable, atomic file downloads shared by the migration scripts.
+
+Bodies are streamed in chunks into ``<dest>.part``, checked against
+Content-Length (and an optional SHA-256), fsynced and renamed into place, so
+``dest`` only ever exists complete. An interrupted download leaves the
+``.part`` file behind and the next attempt resumes it with an HTTP Range
+request when the server supports ranges.
+
+Time spent and bytes received are recorded in metrics.py as the
+``download`` phase and the ``bytes_downloaded`` counter.
+
+Requirements: Python 3.12+, requests
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from fetch_engine import FetchEngine
+from metrics import count, timer
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+UNSATISFIED_RANGE_PATTERN = re.compile(r"bytes \*/(\d+)")
+
+
+class IncompleteDownloadError(requests.RequestException):
+    """Downloaded body did not match the advertised length or checksum."""
+
+
+def partial_path(dest: Path) -> Path:
+    """Return the temporary path a download of ``dest`` streams into."""
+    return dest.with_name(dest.name + ".part")
+
+
+def _resume_offset(response: requests.Response, requested: int) -> Optional[int]:
+    """Return the offset the server resumed from, or None if it sent the whole body."""
+    if response.status_code != 206:
+        return None
+    match = CONTENT_RANGE_PATTERN.match(response.headers.get("Content-Range", ""))
+    if not match or int(match.group(1)) != requested:
+        raise IncompleteDownloadError(f"Unexpected Content-Range: {response.headers.get('Content-Range')}")
+    return requested
+
+
+def _unsatisfiable_total(response: requests.Response) -> Optional[int]:
+    """Return the resource length a 416 response reports, if any."""
+    match = UNSATISFIED_RANGE_PATTERN.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def download_file(
+    url: str,
+    dest: Path,
+    session: Optional[requests.Session | FetchEngine] = None,
+    sha256: Optional[str] = None,
+    timeout: float = 30,
+) -> int:
+    """Stream ``url`` into ``dest`` atomically and return the file size in bytes.
+
+    ``session`` may be a FetchEngine, so the request is rate limited and
+    retried like every other fetch. When a resume request is answered with
+    416, a ``.part`` file matching the reported length is finalized as is;
+    any other ``.part`` file is discarded and fetched again in full.
+    """
+    http = session or requests
+    part = partial_path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with timer("download"):
+        response = http.get(url, headers=headers, stream=True, timeout=timeout)
+        if offset and response.status_code == 416 and _unsatisfiable_total(response) != offset:
+            # Stale partial file (larger than or different from the resource): start over.
+            response.close()
+            part.unlink(missing_ok=True)
+            offset = 0
+            response = http.get(url, stream=True, timeout=timeout)
+
+        with response:
+            if offset and response.status_code == 416:
+                # The partial file already holds the whole resource.
+                start = expected_total = offset
+                body = iter(())
+            else:
+                response.raise_for_status()
+                resumed_from = _resume_offset(response, offset) if offset else None
+                start = resumed_from or 0
+                # Content-Length counts encoded bytes; only compare when the body is sent as-is.
+                expected = response.headers.get("Content-Length")
+                encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+                expected_total = start + int(expected) if expected is not None and not encoded else None
+                body = response.iter_content(chunk_size=CHUNK_SIZE)
+
+            digest = hashlib.sha256()
+            if start and sha256:
+                with part.open("rb") as existing:
+                    for chunk in iter(lambda: existing.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+
+            with part.open("ab" if start else "wb") as fh:
+                for chunk in body:
+                    fh.write(chunk)
+                    digest.update(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+            count("bytes_downloaded", part.stat().st_size - start)
+
+    size = part.stat().st_size
+    if expected_total is not None and size != expected_total:
+        raise IncompleteDownloadError(f"Expected {expected_total} bytes, got {size} for {url}")
+    if sha256 and digest.hexdigest() != sha256.lower():
+        part.unlink(missing_ok=True)
+        raise IncompleteDownloadError(f"SHA-256 mismatch for {url}")
+
+    os.replace(part, dest)
+    return size
@@ -5,20 +5,35 @@ Image extraction and download utility for Google Sites mirror.
 Extracts all image URLs from cached HTML files, audits existing downloads,
 and downloads any missing images at highest resolution.
 
-Requirements: Python 3.12+, requests, beautifulsoup4
+Requirements: Python 3.12+, requests; optional: Pillow (compares decoded image dimensions)
 """
 
+import argparse
 import json
+import os
 import re
+import shutil
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from html.parser import HTMLParser
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from cache_index import CacheIndex, cache_filename, content_sha256, slug_for_url
+from downloads import IncompleteDownloadError, download_file
+from fetch_engine import DEFAULT_RATE, FetchEngine
+from metrics import count, timer, write_metrics_at_exit
+from profiling import add_profile_arguments, start_profile
 
 
 # Constants
@@ -28,71 +43,104 @@ REPORT_DIR = Path("agent-os/specs/2025-12-15-mirror-google-sites-content/plannin
 
 # Google Sites image URL patterns
 GOOGLEUSERCONTENT_PATTERN = re.compile(r"https://lh\d+\.googleusercontent\.com/")
+CSS_IMAGE_URL_PATTERN = re.compile(r'url\(["\']?(https://lh\d+\.googleusercontent\.com/[^"\')\s]+)["\']?\)')
+IMAGE_TAGS = {"img", "source"}
+SRCSET_ATTRIBUTES = {"srcset", "data-srcset"}
+SCAN_CHUNK_SIZE = 64 * 1024
+SCAN_CACHE_NAME = "image-scan.json"  # cache file -> (content hash, image URLs)
+DEFAULT_DOWNLOAD_WORKERS = 4
+VARIANT_CACHE_NAME = "image-variants.json"  # normalized URL -> chosen variant
+VARIANT_TTL = 30 * 24 * 3600  # seconds before a variant choice is probed again
+ORIGINAL_SUFFIX = "=s0"
+WORK_SUFFIXES = {".part", ".tmp", ".upgrade"}  # in-progress files next to downloaded images
+PROBE_SUFFIXES = ("=s0", "=w16383")  # original upload, widest rendition
+CONTENT_RANGE_TOTAL_PATTERN = re.compile(r"bytes \d+-\d+/(\d+)")
+
+# Pages cached before the index existed; unindexed files named after these are indexed on sight
+LEGACY_PAGE_URLS = (
+    "https://sites.google.com/view/msdsoftmatter",
+    "https://sites.google.com/view/msdsoftmatter/home",
+    "https://sites.google.com/view/msdsoftmatter/wei-chen",
+    "https://sites.google.com/view/msdsoftmatter/our-team",
+    "https://sites.google.com/view/msdsoftmatter/research",
+    "https://sites.google.com/view/msdsoftmatter/publications",
+    "https://sites.google.com/view/msdsoftmatter/facilities",
+    "https://sites.google.com/view/msdsoftmatter/links",
+    "https://sites.google.com/view/msdsoftmatter/contact",
+)
+
+class ImageURLScanner(HTMLParser):
+    """Single-pass, tree-free collector of Google-hosted image URLs.
+
+    Picks up <img>/<source> src plus data-src and srcset attributes, url() values
+    in style attributes and in inline <style> blocks. Script bodies are
+    skipped by the tokenizer, so URLs inside JavaScript strings are ignored.
+    Markup may be fed in chunks of any size.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.attribute_urls: list[str] = []
+        self.style_urls: list[str] = []
+        self._in_style = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == "data-src" or (name == "src" and tag in IMAGE_TAGS):
+                self._add(self.attribute_urls, value)
+            elif name in SRCSET_ATTRIBUTES:
+                for candidate in value.split(","):
+                    self._add(self.attribute_urls, candidate.strip().split(" ", 1)[0])
+            elif name == "style":
+                self.style_urls.extend(CSS_IMAGE_URL_PATTERN.findall(value))
+        if tag == "style":
+            self._in_style = True
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        self._in_style = False
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_style:
+            self.style_urls.extend(CSS_IMAGE_URL_PATTERN.findall(data))
 
-# Page mapping from Task Group 1
-PAGE_MAPPING = {
-    "726dc4aed019ddfe8d4aec84beb2a58e094239610ef20397472266c525c9f9d5.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter",
-        "page": "base",
-    },
-    "db0960b28cd11087d539789cdc901bd515d45c0a638561ed5b52131e376010fb.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/home",
-        "page": "home",
-    },
-    "7c44d6002797ed4e16888a8e51cfa9cd3584371c4278971ef54cf76828586dd8.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/wei-chen",
-        "page": "wei-chen",
-    },
-    "48dc46bb5ac6f1605b8f428e06475cd1cbae047dd751fe44f93c547e67fc3173.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/our-team",
-        "page": "our-team",
-    },
-    "9b3e538070721b79b927bb10c747462358aad4fef8b2b1983c78396175cfc19a.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/research",
-        "page": "research",
-    },
-    "a113c8020ff098c659bfbb2fe65ec1dd97dba9f68ecc3493cd870f06d1a794e7.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/publications",
-        "page": "publications",
-    },
-    "1774d69b9a9f50b6f6b5fc94c2ba1e2c8d4bb86ec99240e01b7ab28d84213a00.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/facilities",
-        "page": "facilities",
-    },
-    "80bf5a1708d72eb5e193a8e97fa8950695a585259582498376eca0d6c1867db5.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/links",
-        "page": "links",
-    },
-    "4d7cc1730f37e5f9977b709cadd0672bd01df22860fa533766448266a5230574.html": {
-        "url": "https://sites.google.com/view/msdsoftmatter/contact",
-        "page": "contact",
-    },
-}
+    def _add(self, urls: list[str], url: str) -> None:
+        if GOOGLEUSERCONTENT_PATTERN.match(url):
+            urls.append(url)
+
+    def image_urls(self) -> list[str]:
+        """Attribute URLs in document order, followed by CSS url() values."""
+        return self.attribute_urls + self.style_urls
 
 
 def extract_image_urls_from_html(html_content: str) -> list[str]:
     """Extract all image URLs from HTML content."""
-    soup = BeautifulSoup(html_content, "html.parser")
-    image_urls = []
-
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        if src and GOOGLEUSERCONTENT_PATTERN.match(src):
-            image_urls.append(src)
+    scanner = ImageURLScanner()
+    scanner.feed(html_content)
+    scanner.close()
+    return scanner.image_urls()
 
-    # Also check for background images in style attributes
-    for element in soup.find_all(style=True):
-        style = element.get("style", "")
-        urls = re.findall(r'url\(["\']?(https://lh\d+\.googleusercontent\.com/[^"\')\s]+)["\']?\)', style)
-        image_urls.extend(urls)
 
-    return image_urls
+def extract_image_urls_from_file(path: Path) -> list[str]:
+    """Extract image URLs from an HTML file, streaming it through the scanner."""
+    scanner = ImageURLScanner()
+    with path.open("r", encoding="utf-8") as fh:
+        for chunk in iter(lambda: fh.read(SCAN_CHUNK_SIZE), ""):
+            scanner.feed(chunk)
+    scanner.close()
+    return scanner.image_urls()
 
 
 def normalize_image_url(url: str) -> str:
     """Normalize image URL by extracting the base part without size parameter."""
-    # Remove size parameter (=w1280, =w16383, etc.)
-    match = re.match(r"(.*?)(=w\d+)?$", url)
+    # Remove size parameter (=w1280, =w16383, =s0, etc.)
+    match = re.match(r"(.*?)(=[ws]\d+)?$", url)
     if match:
         return match.group(1)
     return url
@@ -104,6 +152,99 @@ def get_high_res_url(url: str) -> str:
     return f"{base_url}=w16383"
 
 
+def variant_urls(img: dict[str, Any]) -> list[str]:
+    """Candidate URLs for an image, most preferred first on equal size."""
+    candidates = [f"{img['normalized_url']}{suffix}" for suffix in PROBE_SUFFIXES]
+    return list(dict.fromkeys(candidates + img["original_urls"]))
+
+
+def probe_size(url: str, engine: FetchEngine) -> int | None:
+    """Byte size of ``url`` without downloading it, or None if it can't be fetched.
+
+    Tries HEAD first; servers that omit Content-Length there are asked for
+    the first byte, whose Content-Range carries the full size.
+    """
+    try:
+        response = engine.head(url)
+        length = response.headers.get("Content-Length")
+        if response.ok and length and response.headers.get("Content-Encoding", "identity") == "identity":
+            return int(length)
+        if response.status_code not in (200, 405):
+            return None
+
+        with engine.get(url, headers={"Range": "bytes=0-0"}, stream=True) as response:
+            match = CONTENT_RANGE_TOTAL_PATTERN.match(response.headers.get("Content-Range", ""))
+            if response.status_code == 206 and match:
+                return int(match.group(1))
+    except requests.RequestException as e:
+        print(f"  Probe failed: {url}: {e}")
+    return None
+
+
+def choose_variant(img: dict[str, Any], engine: FetchEngine) -> dict[str, Any] | None:
+    """Probe every variant of an image and return the largest as {url, suffix, size}.
+
+    An image the site already links at =s0 is the original upload, so it is
+    chosen without probing (its size is left as None).
+    """
+    original = f"{img['normalized_url']}{ORIGINAL_SUFFIX}"
+    if original in img["original_urls"]:
+        return {"url": original, "suffix": ORIGINAL_SUFFIX, "size": None, "probed_at": time.time()}
+
+    best = None
+    for url in variant_urls(img):
+        with timer("probe"):
+            size = probe_size(url, engine)
+        if size is not None and (best is None or size > best["size"]):
+            best = {"url": url, "suffix": url[len(img["normalized_url"]):], "size": size}
+    if best:
+        best["probed_at"] = time.time()
+    return best
+
+
+def load_variant_cache() -> dict[str, dict[str, Any]]:
+    """Variants chosen by earlier runs, keyed by normalized URL."""
+    try:
+        return json.loads((CACHE_DIR / VARIANT_CACHE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_variant_cache(choices: dict[str, dict[str, Any]]) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / VARIANT_CACHE_NAME).write_text(json.dumps(choices, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def choose_variants(
+    images: list[dict[str, Any]], engine: FetchEngine, workers: int, reprobe: bool = False
+) -> dict[str, dict[str, Any]]:
+    """Best variant per normalized URL, probing in parallel only images not chosen recently.
+
+    Choices older than VARIANT_TTL are probed again, since the site can
+    replace an image behind the same URL.
+    """
+    choices = {} if reprobe else load_variant_cache()
+    expired = time.time() - VARIANT_TTL
+    pending = [
+        img
+        for img in images
+        if choices.get(img["normalized_url"], {}).get("probed_at", 0) < expired
+    ]
+    count("variant_cache_hits", len(images) - len(pending))
+    count("variant_cache_misses", len(pending))
+    print(f"Probing {len(pending)} image(s), reusing {len(images) - len(pending)} earlier choice(s)")
+
+    probed = engine.map(lambda img: choose_variant(img, engine), pending, workers=workers)
+    for img, choice in zip(pending, probed):
+        if choice is not None:
+            choices[img["normalized_url"]] = choice
+        else:
+            choices.pop(img["normalized_url"], None)
+
+    save_variant_cache(choices)
+    return choices
+
+
 def extract_filename_from_url(url: str) -> str:
     """Extract filename from Google Sites image URL."""
     # Parse URL and get path
@@ -119,52 +260,112 @@ def extract_filename_from_url(url: str) -> str:
         filename = path.split("/")[-1]
 
     # Remove size parameter for consistent filenames
-    filename = re.sub(r"=w\d+$", "", filename)
+    filename = re.sub(r"=[ws]\d+$", "", filename)
 
     return filename
 
 
-def scan_cache_for_images() -> dict[str, list[dict[str, Any]]]:
-    """Scan all cached HTML files and extract image URLs with page context."""
+def load_scan_cache() -> dict[str, dict[str, Any]]:
+    """Image URLs found in each cache file by earlier runs, keyed by file name."""
+    try:
+        return json.loads((CACHE_DIR / SCAN_CACHE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def scan_cache_for_images(jobs: int | None = None) -> dict[str, list[dict[str, Any]]]:
+    """Scan all cached HTML files and extract image URLs with page context.
+
+    Pages come from the cache index written by import_google_site.py; files
+    cached before the index existed are indexed from LEGACY_PAGE_URLS, and
+    the script exits non-zero when no cache file is indexed at all. Only
+    files whose content hash changed since the last scan are tokenized, on a
+    process pool (``jobs`` workers, default one per CPU); results are merged
+    in glob order, so the output matches a full serial scan.
+    """
     results: dict[str, list[dict[str, Any]]] = {}
+    pages_seen: dict[str, set[str]] = {}
 
     if not CACHE_DIR.exists():
         print(f"Error: Cache directory not found: {CACHE_DIR}")
         sys.exit(1)
 
+    index = CacheIndex(CACHE_DIR)
+    previous_scan = load_scan_cache()
+    legacy_urls = {cache_filename(url): url for url in LEGACY_PAGE_URLS}
+    indexed: list[tuple[Path, dict[str, Any]]] = []
     for cache_file in CACHE_DIR.glob("*.html"):
-        filename = cache_file.name
-
-        if filename not in PAGE_MAPPING:
-            print(f"Warning: Unknown cache file: {filename}")
+        entry = index.get(cache_file.name)
+        if entry is None and cache_file.name in legacy_urls:
+            html = cache_file.read_text(encoding="utf-8")
+            entry = index.record(
+                legacy_urls[cache_file.name],
+                fetched_at=cache_file.stat().st_mtime,
+                etag=None,
+                last_modified=None,
+                content_sha256=content_sha256(html),
+            )
+        if entry is None:
+            print(f"Warning: Unindexed cache file: {cache_file.name} (run import_google_site.py to index it)")
             continue
+        indexed.append((cache_file, entry))
 
-        page_info = PAGE_MAPPING[filename]
-        page_name = page_info["page"]
+    if not indexed:
+        print(f"Error: No indexed pages in {CACHE_DIR} (run import_google_site.py first)")
+        sys.exit(1)
 
-        print(f"Scanning: {page_name} ({filename[:20]}...)")
+    def is_current(filename: str, entry: dict[str, Any]) -> bool:
+        previous = previous_scan.get(filename, {})
+        return (
+            entry.get("content_sha256") is not None
+            and previous.get("content_sha256") == entry["content_sha256"]
+            and "image_urls" in previous
+        )
+
+    stale = [cache_file for cache_file, entry in indexed if not is_current(cache_file.name, entry)]
+    print(f"Tokenizing {len(stale)} changed file(s), reusing {len(indexed) - len(stale)} from the last scan")
+    count("scan_cache_hits", len(indexed) - len(stale))
+    count("scan_cache_misses", len(stale))
+    with timer("parse"):
+        scanned = dict(zip(stale, tokenize_files(stale, jobs)))
+
+    current_scan: dict[str, dict[str, Any]] = {}
+    for cache_file, entry in indexed:
+        filename = cache_file.name
+        page_name = slug_for_url(entry["url"])
+        if cache_file in scanned:
+            image_urls = scanned[cache_file]
+        else:
+            image_urls = previous_scan[filename]["image_urls"]
+        current_scan[filename] = {"content_sha256": entry.get("content_sha256"), "image_urls": image_urls}
 
-        html_content = cache_file.read_text(encoding="utf-8")
-        image_urls = extract_image_urls_from_html(html_content)
+        print(f"Scanning: {page_name} ({filename[:20]}...)")
 
         for url in image_urls:
             normalized = normalize_image_url(url)
+            seen = pages_seen.setdefault(normalized, set())
 
-            if normalized not in results:
-                results[normalized] = []
-
-            # Check if this page is already recorded for this image
-            existing_pages = [r["page"] for r in results[normalized]]
-            if page_name not in existing_pages:
-                results[normalized].append({
+            # Record each page at most once per image
+            if page_name not in seen:
+                seen.add(page_name)
+                results.setdefault(normalized, []).append({
                     "page": page_name,
                     "original_url": url,
                     "filename": extract_filename_from_url(url),
                 })
 
+    (CACHE_DIR / SCAN_CACHE_NAME).write_text(json.dumps(current_scan, indent=2), encoding="utf-8")
     return results
 
 
+def tokenize_files(paths: list[Path], jobs: int | None) -> list[list[str]]:
+    """Run extract_image_urls_from_file over paths, in a process pool when worthwhile."""
+    if jobs == 1 or len(paths) < 2:
+        return [extract_image_urls_from_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(extract_image_urls_from_file, paths))
+
+
 def audit_existing_images() -> dict[str, list[Path]]:
     """Audit existing downloaded images in assets/img/imported/."""
     existing: dict[str, list[Path]] = {}
@@ -177,10 +378,11 @@ def audit_existing_images() -> dict[str, list[Path]]:
             continue
 
         for image_file in page_dir.iterdir():
-            if image_file.is_file() and not image_file.name.startswith("."):
+            # Skip hidden files and unfinished downloads or upgrades
+            if image_file.is_file() and not image_file.name.startswith(".") and image_file.suffix not in WORK_SUFFIXES:
                 # Extract base filename (remove extension and size params)
                 base_name = image_file.stem
-                base_name = re.sub(r"=w\d+$", "", base_name)
+                base_name = re.sub(r"=[ws]\d+$", "", base_name)
 
                 if base_name not in existing:
                     existing[base_name] = []
@@ -189,29 +391,153 @@ def audit_existing_images() -> dict[str, list[Path]]:
     return existing
 
 
-def download_image(url: str, dest_path: Path, max_retries: int = 3) -> bool:
-    """Download image from URL to destination path with retry logic."""
-    for attempt in range(max_retries):
+def download_image(url: str, dest_path: Path, engine: FetchEngine, max_attempts: int = 3) -> bool:
+    """Download image from URL to destination path.
+
+    The engine retries throttled and failed requests; a truncated body is
+    retried here, resuming the partial ``.part`` file.
+    """
+    for attempt in range(max_attempts):
         try:
             print(f"  Downloading: {dest_path.name}")
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            dest_path.write_bytes(response.content)
-
+            download_file(url, dest_path, session=engine)
             return True
 
+        except IncompleteDownloadError as e:
+            print(f"  Attempt {attempt + 1}/{max_attempts} incomplete: {e}")
         except requests.RequestException as e:
-            print(f"  Attempt {attempt + 1}/{max_retries} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)  # Exponential backoff
+            print(f"  Failed: {dest_path.name}: {e}")
+            return False
 
     return False
 
 
+def image_pixels(path: Path) -> int | None:
+    """Decoded width x height of an image file, or None without Pillow or for unreadable files."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            return image.width * image.height
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def is_current(choice: dict[str, Any], local_files: list[Path]) -> bool:
+    """Whether the local copies already hold the chosen variant.
+
+    Once a variant has been downloaded its decoded pixel count is recorded on
+    the choice and compared with the local copy's. Before that only the
+    probed byte size is known, which stands in for resolution (a larger
+    file is assumed to be a larger image). An =s0 original the site links
+    directly is current as soon as any copy exists.
+    """
+    if not local_files or choice["size"] is None:
+        return bool(local_files)
+    local_pixels = max((image_pixels(path) or 0 for path in local_files), default=0)
+    if choice.get("pixels") and local_pixels:
+        return local_pixels >= choice["pixels"]
+    return max(path.stat().st_size for path in local_files) >= choice["size"]
+
+
+def replace_local_copies(download: Path, local_files: list[Path]) -> None:
+    """Put the downloaded bytes in place of every local copy, keeping their paths.
+
+    Imported pages link to the existing file names, so replacing the files
+    in place upgrades them without touching any reference.
+    """
+    for path in local_files[1:]:
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        shutil.copyfile(download, tmp_path)
+        os.replace(tmp_path, path)
+    os.replace(download, local_files[0])
+
+
+def download_best_image(
+    img: dict[str, Any], choice: dict[str, Any] | None, local_files: list[Path], engine: FetchEngine
+) -> dict[str, Any]:
+    """Fetch the best variant of one image unless a local copy is already as large.
+
+    Without a probe result the image is downloaded at =w16383 if no copy
+    exists yet. An upgrade replaces the superseded local copies in place,
+    and is discarded when it decodes to no more pixels than they have.
+    Returns the image's report entry.
+    """
+    filename = img["filename"]
+    primary_page = img["pages"][0]
+    current = {
+        "filename": filename,
+        "status": "current",
+        "path": str(local_files[0]) if local_files else None,
+        "pages": img["pages"],
+    }
+
+    if choice is None:
+        if local_files:
+            return {**current, "status": "skipped"}
+        url, suffix = get_high_res_url(img["normalized_url"]), "=w16383"
+    elif is_current(choice, local_files):
+        return current
+    else:
+        url, suffix = choice["url"], choice["suffix"]
+
+    if local_files:
+        dest_path = local_files[0].with_name(f"{local_files[0].name}.upgrade")
+    else:
+        dest_path = ASSETS_DIR / primary_page / f"{filename}{suffix}"
+    if not download_image(url, dest_path, engine):
+        return {"filename": filename, "status": "failed", "path": None, "url": url, "pages": img["pages"]}
+    if not local_files:
+        return {"filename": filename, "status": "success", "path": str(dest_path), "url": url, "pages": img["pages"]}
+
+    pixels = image_pixels(dest_path)
+    if choice is not None and pixels:
+        choice["pixels"] = pixels
+    local_pixels = max((image_pixels(path) or 0 for path in local_files), default=0)
+    if pixels and local_pixels >= pixels:
+        dest_path.unlink()
+        return current
+    replace_local_copies(dest_path, local_files)
+    return {"filename": filename, "status": "upgraded", "path": str(local_files[0]), "url": url, "pages": img["pages"]}
+
+
 def main() -> None:
     """Main entry point for image extraction and download."""
+    parser = argparse.ArgumentParser(description="Extract, audit and download Google Sites images")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Processes for the cache scan (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        metavar="RPS",
+        help=f"Download requests per second per host, 0 = unlimited (default: {DEFAULT_RATE})",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DEFAULT_DOWNLOAD_WORKERS,
+        metavar="N",
+        help=f"Parallel image probes and downloads (default: {DEFAULT_DOWNLOAD_WORKERS})",
+    )
+    parser.add_argument(
+        "--reprobe",
+        action="store_true",
+        help=f"Ignore variant choices cached in {VARIANT_CACHE_NAME} and probe every image again",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write per-phase timings and counters (bytes, cache hits, retries) to PATH at exit",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    write_metrics_at_exit(args.metrics_json, "extract_images")
+    start_profile(args, "extract_images")
+
     print("=" * 60)
     print("MSD Soft Matter Lab - Image Extraction and Download")
     print("=" * 60)
@@ -221,7 +547,7 @@ def main() -> None:
     print("TASK 2.1: Extracting image URLs from cached HTML files...")
     print("-" * 60)
 
-    image_data = scan_cache_for_images()
+    image_data = scan_cache_for_images(jobs=args.jobs)
 
     print()
     print(f"Found {len(image_data)} unique images across all pages")
@@ -247,8 +573,8 @@ def main() -> None:
         for page in img["pages"]:
             page_counts[page] = page_counts.get(page, 0) + 1
 
-    for page, count in sorted(page_counts.items()):
-        print(f"  {page}: {count} images")
+    for page, image_count in sorted(page_counts.items()):
+        print(f"  {page}: {image_count} images")
 
     print()
 
@@ -265,8 +591,8 @@ def main() -> None:
     print("Images per folder:")
     for page_dir in sorted(ASSETS_DIR.iterdir()):
         if page_dir.is_dir():
-            count = len(list(page_dir.glob("*")))
-            print(f"  {page_dir.name}/: {count} files")
+            file_count = len(list(page_dir.glob("*")))
+            print(f"  {page_dir.name}/: {file_count} files")
 
     print()
 
@@ -290,42 +616,24 @@ def main() -> None:
     print()
 
     # Task 2.3: Download missing images at highest resolution
-    print("TASK 2.3: Downloading missing images...")
+    print("TASK 2.3: Downloading missing images at the best available variant...")
     print("-" * 60)
 
-    download_results: list[dict[str, Any]] = []
-
-    if not missing_images:
-        print("No missing images to download!")
-    else:
-        for img in missing_images:
-            high_res_url = get_high_res_url(img["normalized_url"])
-            filename = img["filename"]
-            primary_page = img["pages"][0]
-
-            dest_path = ASSETS_DIR / primary_page / f"{filename}=w16383"
-
-            if dest_path.exists():
-                print(f"  Already exists: {dest_path.name}")
-                download_results.append({
-                    "filename": filename,
-                    "status": "skipped",
-                    "path": str(dest_path),
-                    "pages": img["pages"],
-                })
-                continue
-
-            success = download_image(high_res_url, dest_path)
-            download_results.append({
-                "filename": filename,
-                "status": "success" if success else "failed",
-                "path": str(dest_path) if success else None,
-                "url": high_res_url,
-                "pages": img["pages"],
-            })
-
-            if success:
-                time.sleep(0.5)  # Polite delay
+    engine = FetchEngine(rate=args.rate)
+    choices = choose_variants(all_images, engine, args.download_workers, reprobe=args.reprobe)
+    download_results = engine.map(
+        lambda img: download_best_image(
+            img, choices.get(img["normalized_url"]), existing_images.get(img["filename"], []), engine
+        ),
+        all_images,
+        workers=args.download_workers,
+    )
+    save_variant_cache(choices)  # with the pixel counts of variants downloaded just now
+    status_counts: dict[str, int] = {}
+    for result in download_results:
+        status_counts[result["status"]] = status_counts.get(result["status"], 0) + 1
+        count(f"images_{result['status']}")
+    print("  " + ", ".join(f"{status}: {status_count}" for status, status_count in sorted(status_counts.items())))
 
     print()
 
@@ -364,9 +672,11 @@ def main() -> None:
             "total_unique_images_in_cache": len(all_images),
             "images_matched_to_existing_files": len(matched_images),
             "missing_images_identified": len(missing_images),
+            "images_already_best": status_counts.get("current", 0),
+            "images_upgraded": status_counts.get("upgraded", 0),
             "images_still_missing": len(final_missing),
         },
-        "images_by_page": {page: count for page, count in sorted(page_counts.items())},
+        "images_by_page": dict(sorted(page_counts.items())),
         "all_images": [
             {
                 "filename": img["filename"],
@@ -388,13 +698,15 @@ def main() -> None:
 
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
     report_path = REPORT_DIR / "image-extraction-report.json"
-    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    with timer("write"):
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
     print(f"Report saved to: {report_path}")
 
     # Also generate a markdown summary
     md_report = generate_markdown_report(report, all_images, existing_images)
     md_path = REPORT_DIR / "image-extraction-report.md"
-    md_path.write_text(md_report, encoding="utf-8")
+    with timer("write"):
+        md_path.write_text(md_report, encoding="utf-8")
     print(f"Markdown report saved to: {md_path}")
 
     print()
@@ -431,8 +743,8 @@ def generate_markdown_report(
         "|------|-------------|",
     ]
 
-    for page, count in sorted(report["images_by_page"].items()):
-        lines.append(f"| {page} | {count} |")
+    for page, image_count in sorted(report["images_by_page"].items()):
+        lines.append(f"| {page} | {image_count} |")
 
     lines.extend([
         "",
@@ -0,0 +1,183 @@
+"""
+Shared HTTP fetch engine for the migration scripts.
+
+One pooled ``requests.Session`` plus a per-host token bucket, so every
+script gets its politeness from a single ``rate`` knob instead of fixed
+sleeps on the hot path:
+
+- Each host refills ``rate`` tokens per second up to ``burst``; a request
+  takes one token and blocks until it is available. The budget holds no
+  matter how many worker threads share the engine.
+- 429 and 5xx responses and connection errors are retried up to
+  ``retries`` times with full-jitter exponential backoff. A ``Retry-After``
+  header overrides the backoff and pauses the whole host, not just the
+  thread that received it.
+- ``FetchEngine.get`` has the same signature as ``Session.get`` and returns
+  the final response unchecked, so callers keep their ``raise_for_status``.
+- Every attempt counts toward ``requests`` and every retry toward
+  ``retries`` in metrics.py; time blocked on the bucket is the ``throttle``
+  phase.
+
+Requirements: Python 3.12+, requests
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import count, timer
+
+DEFAULT_RATE = 2.5  # requests per second per host
+DEFAULT_BURST = 2
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds; doubled per attempt, then jittered
+MAX_BACKOFF = 30.0
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class HostRateLimiter:
+    """Token bucket per host: ``rate`` tokens per second, at most ``burst`` banked.
+
+    Tokens may go negative; the deficit is the queue of callers already
+    waiting, so reservations are handed out in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = DEFAULT_BURST) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets: dict[str, tuple[float, float]] = {}  # host -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def _refill(self, host: str, now: float) -> float:
+        tokens, updated = self._buckets.get(host, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def wait(self, url: str) -> None:
+        """Block until ``url``'s host has a token, then take it."""
+        if self.rate <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._refill(host, now) - 1
+            self._buckets[host] = (tokens, now)
+        if tokens < 0:
+            time.sleep(-tokens / self.rate)
+
+    def defer(self, url: str, seconds: float) -> None:
+        """Hand out no tokens for ``url``'s host for the next ``seconds``."""
+        if self.rate <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self._refill(host, now), -seconds * self.rate)
+            self._buckets[host] = (tokens, now)
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class FetchEngine:
+    """Pooled, rate-limited, retrying HTTP client shared by worker threads."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.limiter = HostRateLimiter(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request under the host's budget, retrying transient failures.
+
+        Returns the last response even if its status is an error; raises the
+        last connection error once retries are exhausted.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            final = attempt >= self.retries
+            with timer("throttle"):
+                self.limiter.wait(url)
+            count("requests")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if final:
+                    raise
+                delay = backoff_delay(attempt, self.backoff)
+                print(f"  Retrying {url} in {delay:.1f}s: {exc}")
+                count("retries")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if final or response.status_code not in RETRY_STATUSES:
+                return response
+            retry_after = retry_after_seconds(response)
+            response.close()
+            delay = backoff_delay(attempt, self.backoff) if retry_after is None else min(retry_after, MAX_BACKOFF)
+            if retry_after is not None and self.limiter.rate > 0:
+                # The server asked the whole host to back off, not just this request
+                self.limiter.defer(url, delay)
+            else:
+                time.sleep(delay)
+            print(f"  Retrying {url} in {delay:.1f}s: HTTP {response.status_code}")
+            count("retries")
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("HEAD", url, **kwargs)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T], workers: Optional[int] = None) -> list[R]:
+        """Apply ``fn`` to ``items`` on up to ``workers`` threads; results keep input order."""
+        items = list(items)
+        workers = min(workers or self.pool_size, self.pool_size)
+        if workers <= 1 or len(items) < 2:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fn, items))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Google Site, used to exercise the migration
+scripts offline.
+
+Serves a synthetic site under /view/msdsoftmatter/ whose pages look enough
+like Google Sites output (title, section ids, <img> tags, background-image
+styles, internal and external links) for the crawler and importer to walk.
+An optional per-request latency simulates a remote server so concurrency
+speedups can be measured.
+
+serve_recorded_site() serves recorded page HTML instead (slug -> HTML) and
+answers for lh*.googleusercontent.com as well: image URLs in the served
+pages point back at the stand-in, which returns deterministic PNG bodies,
+so the importer can run end to end without the network.
+
+Usage:
+    python3 scripts/fixture_site.py --pages 200 --latency 0.05
+    python3 scripts/crawl_inventory.py --start-url http://127.0.0.1:8765/view/msdsoftmatter/ \
+        --output-dir tmp/fixture-docs --concurrency 8 --rate 50
+
+Requirements: Python 3.12+ (standard library only)
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+SITE_PREFIX = "/view/msdsoftmatter/"
+DEFAULT_PORT = 8765
+DEFAULT_PAGES = 50
+LINKS_PER_PAGE = 4
+IMAGE_HOST_PATTERN = re.compile(r"https://(lh\d+)\.googleusercontent\.com/")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def render_page(index: int, page_count: int) -> str:
+    """Render synthetic page ``index`` of a ``page_count`` page site."""
+    links = []
+    for offset in range(1, LINKS_PER_PAGE + 1):
+        target = (index * 7 + offset * 13) % page_count
+        links.append(f'<a href="{SITE_PREFIX}page-{target}">Page {target}</a>')
+    if index + 1 < page_count:
+        links.append(f'<a href="{SITE_PREFIX}page-{index + 1}#top">Next</a>')
+    links.append('<a href="https://www.anl.gov/">Argonne</a>')
+
+    images = (
+        f'<img src="https://lh3.googleusercontent.com/sitesv/FIXTURE{index:04d}=w1280">'
+        f'<div style="background-image: url(\'https://lh3.googleusercontent.com/sitesv/BG{index % 5}=w1280\')"></div>'
+    )
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>MSD Soft Matter Lab - Page {index}</title></head><body>"
+        f'<section id="h.fixture_{index}_a"><h1>Page {index}</h1>'
+        f"<p>Synthetic fixture content for page {index}.</p>{images}</section>"
+        f'<section id="h.fixture_{index}_b"><nav>{" ".join(links)}</nav></section>'
+        "</body></html>"
+    )
+
+
+def fixture_image(path: str) -> bytes:
+    """Deterministic 4 KB body with a PNG signature, unique per image path."""
+    return PNG_SIGNATURE + hashlib.sha256(path.encode("utf-8")).digest() * 128
+
+
+def make_handler(page_count: int, latency: float) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to one fixture configuration."""
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if latency > 0:
+                time.sleep(latency)
+
+            path = self.path.split("?", 1)[0]
+            if path in {SITE_PREFIX, SITE_PREFIX.rstrip("/")}:
+                index = 0
+            elif path.startswith(f"{SITE_PREFIX}page-"):
+                try:
+                    index = int(path[len(f"{SITE_PREFIX}page-"):])
+                except ValueError:
+                    index = -1
+            else:
+                index = -1
+
+            if not 0 <= index < page_count:
+                self.send_error(404)
+                return
+
+            body = render_page(index, page_count).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    return FixtureHandler
+
+
+def make_recorded_handler(pages: dict[str, str], latency: float) -> type[BaseHTTPRequestHandler]:
+    """Build a handler serving recorded pages (slug -> HTML) and stand-in images."""
+
+    class RecordedHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if latency > 0:
+                time.sleep(latency)
+
+            path = self.path.split("?", 1)[0]
+            if path in {SITE_PREFIX, SITE_PREFIX.rstrip("/")}:
+                slug = "home"
+            elif path.startswith(SITE_PREFIX):
+                slug = path[len(SITE_PREFIX):].strip("/")
+            else:
+                slug = None
+
+            if slug is not None and slug in pages:
+                # Point image URLs back at this server instead of Google
+                origin = f"http://{self.headers.get('Host')}/"
+                html = IMAGE_HOST_PATTERN.sub(lambda match: f"{origin}{match.group(1)}/", pages[slug])
+                self._send(html.encode("utf-8"), "text/html; charset=utf-8")
+            elif re.match(r"/lh\d+/", path):
+                self._send(fixture_image(path), "image/png")
+            else:
+                self.send_error(404)
+
+        def _send(self, body: bytes, content_type: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    return RecordedHandler
+
+
+@contextmanager
+def serve_fixture_site(
+    page_count: int = DEFAULT_PAGES, latency: float = 0.0, port: int = 0
+) -> Iterator[str]:
+    """Run the fixture site in a background thread and yield its start URL."""
+    with serve_handler(make_handler(page_count, latency), port) as start_url:
+        yield start_url
+
+
+@contextmanager
+def serve_recorded_site(pages: dict[str, str], latency: float = 0.0, port: int = 0) -> Iterator[str]:
+    """Serve recorded pages in a background thread and yield the site root URL."""
+    with serve_handler(make_recorded_handler(pages, latency), port) as start_url:
+        yield start_url
+
+
+@contextmanager
+def serve_handler(handler: type[BaseHTTPRequestHandler], port: int = 0) -> Iterator[str]:
+    """Run any request handler in a background thread and yield the site root URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, bound_port = server.server_address[:2]
+        yield f"http://{host}:{bound_port}{SITE_PREFIX}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Google Sites stand-in")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help=f"Number of pages (default: {DEFAULT_PAGES})")
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS", help="Artificial delay per request")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default: {DEFAULT_PORT})")
+    args = parser.parse_args()
+
+    with serve_fixture_site(args.pages, args.latency, args.port) as start_url:
+        print(f"Serving {args.pages} fixture pages at {start_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Shared HTML parsing layer for the migration scripts.
+
+Picks the fastest parser installed at runtime and falls back to the
+standard library:
+
+- ``parse_html`` builds a BeautifulSoup tree with lxml when available,
+  otherwise ``html.parser``. Callers that serialize the tree back to disk
+  pass ``preserve_markup=True`` to stay on ``html.parser``, because lxml
+  normalizes markup (implied <html>/<body>, dropped stray tags) on output.
+- ``select_attributes`` answers read-only "attribute values for these CSS
+  selectors" queries with selectolax when available, which skips building a
+  Python object tree entirely.
+
+Set HTML_PARSER_BACKEND=html.parser|lxml|selectolax to force a backend, or
+use ``use_backend`` in code. ``tests/test_parser_parity.py`` verifies that
+every installed backend extracts the same data from the cached pages.
+
+Requirements: Python 3.12+, beautifulsoup4; optional: lxml, selectolax
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401 - only probed for availability
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+
+BACKEND_ENV = "HTML_PARSER_BACKEND"
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+_forced_backend: str | None = None
+
+
+def available_backends() -> list[str]:
+    """Backends usable in this environment, slowest first."""
+    backends = ["html.parser"]
+    if lxml is not None:
+        backends.append("lxml")
+    if SelectolaxParser is not None:
+        backends.append("selectolax")
+    return backends
+
+
+def current_backend() -> str:
+    """Return the backend in effect: forced, from the environment, or fastest."""
+    requested = _forced_backend or os.environ.get(BACKEND_ENV)
+    available = available_backends()
+    if requested in available:
+        return requested
+    return available[-1]
+
+
+@contextmanager
+def use_backend(name: str) -> Iterator[None]:
+    """Force a backend for the duration of the block."""
+    global _forced_backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend: {name}")
+    previous, _forced_backend = _forced_backend, name
+    try:
+        yield
+    finally:
+        _forced_backend = previous
+
+
+def tree_builder() -> str:
+    """BeautifulSoup tree builder for the current backend."""
+    if current_backend() != "html.parser" and lxml is not None:
+        return "lxml"
+    return "html.parser"
+
+
+def parse_html(markup, preserve_markup: bool = False) -> BeautifulSoup:
+    """Parse markup (str, bytes or file) into a BeautifulSoup tree."""
+    return BeautifulSoup(markup, "html.parser" if preserve_markup else tree_builder())
+
+
+def select_attributes(markup: str, queries: Sequence[tuple[str, str]]) -> list[list[str]]:
+    """Return, per (css selector, attribute) query, the attribute values in document order.
+
+    Elements lacking the attribute are skipped. The document is parsed once
+    for all queries.
+    """
+    if current_backend() == "selectolax":
+        tree = SelectolaxParser(markup)
+        return [
+            [value for node in tree.css(selector) if (value := node.attributes.get(attr)) is not None]
+            for selector, attr in queries
+        ]
+
+    soup = parse_html(markup)
+    return [
+        [value for tag in soup.select(selector) if (value := tag.get(attr)) is not None]
+        for selector, attr in queries
+    ]
@@ -4,24 +4,44 @@ Minimal importer for Google Sites pages.
 
 Fetches pages from https://sites.google.com/view/msdsoftmatter, cleans HTML,
 downloads images, converts to Markdown with YAML front matter, and writes to
-pages/<slug>.md. Supports caching, polite delays, and idempotent writes.
+pages/<slug>.md. Supports caching, per-host rate limiting, and idempotent writes.
+
+Pages whose HTML, converter version and options are unchanged since the
+last run are not parsed or converted again (see ConversionCache), and
+last_imported only moves when a page's content changes, so a no-op run
+leaves pages/ untouched.
 
 Requirements: Python 3.12+, requests, beautifulsoup4, markdownify (optional)
 """
 
 import argparse
 import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
 import re
+import threading
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
 from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Callable, Collection, Iterator, Optional, Sequence, TextIO, TypeVar
 from urllib.parse import urljoin, urlparse
 
-import requests
 from bs4 import BeautifulSoup
 
+from cache_index import CacheIndex, cache_filename, content_sha256, slug_for_url
+from downloads import download_file
+from fetch_engine import DEFAULT_RATE, FetchEngine
+from html_backend import parse_html, select_attributes, tree_builder
+from metrics import count, get_metrics, timer, write_metrics_at_exit
+from profiling import add_profile_arguments, start_profile
+
 try:
     from markdownify import markdownify as md
 except ImportError:
@@ -33,7 +53,20 @@ BASE_URL = "https://sites.google.com/view/msdsoftmatter"
 CACHE_DIR = Path(".cache/google_site")
 PAGES_DIR = Path("pages")
 ASSETS_DIR = Path("assets/img/imported")
-DEFAULT_DELAY = 2.0
+DEFAULT_IMAGE_WORKERS = 4
+DEFAULT_JOBS = 1
+JOURNAL_NAME = "import-journal.jsonl"
+JOURNAL_VERSION = 2
+CONVERSION_CACHE_NAME = "conversions.jsonl"
+CONVERTER_VERSION = 1  # bump when clean_html, link_images or html_to_markdown output changes
+LAST_IMPORTED_PATTERN = re.compile(r"^last_imported: .*$", re.MULTILINE)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_engine: Optional[FetchEngine] = None
+_cache_index: Optional[CacheIndex] = None
+_conversion_cache: Optional["ConversionCache"] = None
 
 
 def slugify(text: str) -> str:
@@ -44,23 +77,70 @@ def slugify(text: str) -> str:
     return text.strip("-")
 
 
-def fetch_with_cache(url: str, force: bool = False) -> str:
-    """Fetch URL with disk cache. Returns HTML content."""
-    cache_key = hashlib.sha256(url.encode()).hexdigest()
-    cache_file = CACHE_DIR / f"{cache_key}.html"
+def get_cache_index() -> CacheIndex:
+    """Return the metadata index for CACHE_DIR, loading it on first use."""
+    global _cache_index
+    if _cache_index is None or _cache_index.cache_dir != CACHE_DIR:
+        _cache_index = CacheIndex(CACHE_DIR)
+    return _cache_index
 
-    if not force and cache_file.exists():
-        print(f"  Cache hit: {url}")
-        return cache_file.read_text(encoding="utf-8")
 
-    print(f"  Fetching: {url}")
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
+def fetch_with_cache(url: str, force: bool = False, max_age: Optional[float] = None) -> str:
+    """Fetch URL with disk cache. Returns HTML content.
 
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    cache_file.write_text(response.text, encoding="utf-8")
+    Cached pages are trusted until they are older than ``max_age`` seconds
+    (forever when None). Stale pages are revalidated with a conditional GET
+    using the ETag/Last-Modified validators kept in the cache index, so
+    unchanged pages cost a 304. ``force`` always re-downloads.
+    """
+    index = get_cache_index()
+    cache_file = CACHE_DIR / cache_filename(url)
+    entry = index.lookup(url) or {}
+
+    headers: dict[str, str] = {}
+    if not force and cache_file.exists():
+        fetched_at = entry.get("fetched_at", cache_file.stat().st_mtime)
+        if max_age is None or time.time() - fetched_at < max_age:
+            print(f"  Cache hit: {url}")
+            count("page_cache_hits")
+            html = cache_file.read_text(encoding="utf-8")
+            if not entry:
+                # Page cached before the index existed: backfill its record
+                index.record(url, fetched_at=fetched_at, etag=None, last_modified=None,
+                             content_sha256=content_sha256(html))
+            return html
+
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    print(f"  {'Revalidating' if headers else 'Fetching'}: {url}")
+    with timer("fetch"):
+        response = get_engine().get(url, headers=headers)
+        response.raise_for_status()
+        count("bytes_fetched", len(response.content))
 
-    return response.text
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if response.status_code == 304:
+        # A 304 may omit validators; keep the ones we revalidated with
+        print(f"  Not modified: {url}")
+        count("page_cache_hits")
+        html = cache_file.read_text(encoding="utf-8")
+    else:
+        count("page_cache_misses")
+        html = response.text
+        cache_file.write_text(html, encoding="utf-8")
+        entry = {}
+
+    index.record(
+        url,
+        fetched_at=time.time(),
+        etag=response.headers.get("ETag") or entry.get("etag"),
+        last_modified=response.headers.get("Last-Modified") or entry.get("last_modified"),
+        content_sha256=content_sha256(html),
+    )
+    return html
 
 
 def clean_html(soup: BeautifulSoup) -> None:
@@ -69,41 +149,305 @@ def clean_html(soup: BeautifulSoup) -> None:
         tag.decompose()
 
 
-def download_image(img_url: str, page_slug: str) -> Optional[str]:
-    """Download image to assets/img/imported/<slug>/ and return relative path."""
+def get_engine(rate: Optional[float] = None) -> FetchEngine:
+    """Return the shared fetch engine; passing ``rate`` replaces it with a new budget."""
+    global _engine
+    if _engine is None or rate is not None:
+        _engine = FetchEngine(rate=DEFAULT_RATE if rate is None else rate)
+    return _engine
+
+
+class PageOutput(io.TextIOBase):
+    """sys.stdout stand-in that sends each page's prints to that page's buffer.
+
+    The import pipeline works on several pages at once; capturing their
+    output per page lets it print every page's log in slug order. Threads
+    that are not capturing write straight through to ``stream``.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self._local = threading.local()
+
+    def current(self) -> Optional[io.StringIO]:
+        return getattr(self._local, "buffer", None)
+
+    @contextmanager
+    def capture(self, buffer: Optional[io.StringIO]) -> Iterator[None]:
+        previous = self.current()
+        self._local.buffer = buffer
+        try:
+            yield
+        finally:
+            self._local.buffer = previous
+
+    def write(self, text: str) -> int:
+        buffer = self.current()
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def inherit_output(fn: Callable[[T], R]) -> Callable[[T], R]:
+    """Wrap ``fn`` so pool threads print into the calling thread's page buffer."""
+    output = sys.stdout
+    if not isinstance(output, PageOutput):
+        return fn
+    buffer = output.current()
+
+    def run(item: T) -> R:
+        with output.capture(buffer):
+            return fn(item)
+
+    return run
+
+
+class RunJournal:
+    """Persisted per-page and per-image status of an import run.
+
+    An append-only JSONL file: the first line holds the run's options and
+    every page or image outcome adds one line. Image lines are buffered and
+    written together with their page's line, so checkpointing costs one
+    small write per page however large the run gets. An interrupted or
+    partly failed run can be continued with --resume: finished pages are
+    skipped, and only failed pages and images are retried.
+    """
+
+    def __init__(self, path: Path, data: dict) -> None:
+        self.path = path
+        self.data = data
+        self._pending: list[dict] = []  # image records not yet written
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, path: Path, options: dict) -> "RunJournal":
+        """Begin a new journal, replacing any previous run's."""
+        header = {
+            "version": JOURNAL_VERSION,
+            "started_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "options": options,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        tmp_path.write_text(json.dumps(header, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+        return cls(path, {**header, "pages": {}, "images": {}})
+
+    @classmethod
+    def resume(cls, path: Path, options: dict) -> "RunJournal":
+        """Replay the previous run's journal, or start a new one if it is unusable.
+
+        A journal written with different options describes a different run,
+        so it is replaced rather than continued.
+        """
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+            data = {**json.loads(lines[0]), "pages": {}, "images": {}}
+        except (OSError, ValueError, IndexError):
+            data = None
+        if not data or data.get("version") != JOURNAL_VERSION:
+            print(f"No usable journal at {path}; starting a new run")
+            return cls.start(path, options)
+        if data.get("options") != options:
+            print(f"Journal at {path} was written with options {data.get('options')}; starting a new run")
+            return cls.start(path, options)
+
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn write from an interrupted run
+            if "image" in record:
+                entry = {key: record[key] for key in ("status", "path", "error") if key in record}
+                data["images"].setdefault(record["page"], {})[record["image"]] = entry
+            else:
+                data["pages"][record["page"]] = {key: record.get(key) for key in ("url", "status", "error")}
+        return cls(path, data)
+
+    def _append(self, record: dict) -> None:
+        records, self._pending = [*self._pending, record], []
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(record, sort_keys=True) + "\n" for record in records))
+
+    def page_status(self, slug: str) -> Optional[str]:
+        return self.data["pages"].get(slug, {}).get("status")
+
+    def record_page(self, slug: str, url: str, status: str, error: Optional[str] = None) -> None:
+        entry = {"url": url, "status": status, "error": error}
+        with self._lock:
+            self.data["pages"][slug] = entry
+            self._append({"page": slug, **entry})
+
+    def image_path(self, page_slug: str, img_url: str) -> Optional[str]:
+        """Root-relative path of an image this run already downloaded, if still on disk."""
+        entry = self.data["images"].get(page_slug, {}).get(img_url)
+        if entry and entry["status"] == "done" and (ASSETS_DIR / page_slug / Path(entry["path"]).name).exists():
+            return entry["path"]
+        return None
+
+    def record_image(self, page_slug: str, img_url: str, path: Optional[str], error: Optional[str] = None) -> None:
+        entry = {"status": "done", "path": path} if path else {"status": "failed", "error": error}
+        with self._lock:
+            self.data["images"].setdefault(page_slug, {})[img_url] = entry
+            self._pending.append({"page": page_slug, "image": img_url, **entry})
+
+    def failed_images(self, page_slug: str) -> int:
+        return sum(entry["status"] == "failed" for entry in self.data["images"].get(page_slug, {}).values())
+
+
+def converter_options() -> dict[str, Optional[str]]:
+    """Everything besides the HTML that the Markdown output depends on."""
     try:
-        parsed = urlparse(img_url)
-        if not parsed.scheme:
-            return None
+        markdownify_version = version("markdownify") if md is not None else None
+    except PackageNotFoundError:
+        markdownify_version = "unknown"
+    return {"markdownify": markdownify_version, "tree_builder": tree_builder()}
+
+
+def conversion_key(html: str, url: str, page_slug: str) -> str:
+    """Cache key for the Markdown of one page: (HTML hash, converter version, options)."""
+    material = {
+        "html_sha256": content_sha256(html),
+        "converter_version": CONVERTER_VERSION,
+        "options": converter_options(),
+        "url": url,
+        "slug": page_slug,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+class ConversionCache:
+    """Conversion key, output hash and local images of every written page.
+
+    A page is up to date while its key matches, pages/<slug>.md still holds
+    exactly what was written, and every image it links to is on disk; such
+    pages skip parsing, image processing and conversion. Like the cache
+    index, the file is append-only JSONL (last line per page wins), so
+    recording a page is one small write; it is compacted on load once
+    superseded lines pile up.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        lines = 0
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from an interrupted run
+                    self.entries[entry.pop("page")] = entry
+        except OSError:
+            return
+        if lines > 2 * len(self.entries) + 16:
+            self.compact()
+
+    def is_current(self, page_slug: str, key: str) -> bool:
+        entry = self.entries.get(page_slug)
+        if not entry or entry["key"] != key:
+            return False
+        try:
+            written = (PAGES_DIR / f"{page_slug}.md").read_text(encoding="utf-8")
+        except OSError:
+            return False
+        if content_sha256(written) != entry["output_sha256"]:
+            return False
+        return all((ASSETS_DIR / page_slug / Path(image).name).exists() for image in entry["images"])
+
+    def record(self, page_slug: str, key: str, content: str, images: list[str]) -> None:
+        entry = {"key": key, "output_sha256": content_sha256(content), "images": images}
+        with self._lock:
+            self.entries[page_slug] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"page": page_slug, **entry}, sort_keys=True) + "\n")
+
+    def compact(self) -> None:
+        """Rewrite the file with one line per page."""
+        with self._lock:
+            tmp_path = self.path.with_suffix(".jsonl.tmp")
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                for page_slug, entry in self.entries.items():
+                    fh.write(json.dumps({"page": page_slug, **entry}, sort_keys=True) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+def get_conversion_cache() -> ConversionCache:
+    """Return the conversion cache in CACHE_DIR, loading it on first use."""
+    global _conversion_cache
+    path = CACHE_DIR / CONVERSION_CACHE_NAME
+    if _conversion_cache is None or _conversion_cache.path != path:
+        _conversion_cache = ConversionCache(path)
+    return _conversion_cache
+
+
+def local_image_path(img_url: str, page_slug: str) -> Optional[str]:
+    """Root-relative path download_image stores ``img_url`` under; None without a scheme."""
+    parsed = urlparse(img_url)
+    if not parsed.scheme:
+        return None
+
+    # Extract filename from URL
+    filename = Path(parsed.path).name
+    if not filename:
+        filename = f"image_{hashlib.md5(img_url.encode()).hexdigest()[:8]}.jpg"
+    return f"/assets/img/imported/{page_slug}/{filename}"
+
 
-        # Extract filename from URL
-        filename = Path(parsed.path).name
-        if not filename:
-            filename = f"image_{hashlib.md5(img_url.encode()).hexdigest()[:8]}.jpg"
+def download_image(img_url: str, page_slug: str, journal: Optional[RunJournal] = None) -> Optional[str]:
+    """Download image to assets/img/imported/<slug>/ and return relative path.
+
+    With a journal, images it lists as done are not checked again and every
+    outcome is recorded.
+    """
+    if journal:
+        done_path = journal.image_path(page_slug, img_url)
+        if done_path:
+            return done_path
+
+    try:
+        local_path = local_image_path(img_url, page_slug)
+        if local_path is None:
+            return None
 
         # Create directory structure
         img_dir = ASSETS_DIR / page_slug
         img_dir.mkdir(parents=True, exist_ok=True)
 
-        img_path = img_dir / filename
+        img_path = img_dir / Path(local_path).name
 
         # Download if not exists
-        if not img_path.exists():
-            print(f"    Downloading image: {filename}")
-            response = requests.get(img_url, timeout=30)
-            response.raise_for_status()
-            img_path.write_bytes(response.content)
-
-        # Return root-relative path
-        return f"/assets/img/imported/{page_slug}/{filename}"
+        if img_path.exists():
+            count("image_cache_hits")
+        else:
+            print(f"    Downloading image: {img_path.name}")
+            count("image_cache_misses")
+            download_file(img_url, img_path, session=get_engine())
 
     except Exception as e:
         print(f"    Warning: Failed to download {img_url}: {e}")
+        if journal:
+            journal.record_image(page_slug, img_url, None, error=str(e))
         return None
 
+    if journal:
+        journal.record_image(page_slug, img_url, local_path)
+    return local_path
 
-def process_images(soup: BeautifulSoup, page_slug: str, base_url: str) -> None:
-    """Download images and update src attributes to root-relative paths."""
+
+def link_images(soup: BeautifulSoup, page_slug: str, base_url: str, failed: Collection[str] = ()) -> list[str]:
+    """Point image src attributes at the root-relative paths download_image stores them under.
+
+    Images in ``failed`` keep their remote src. Returns the absolute URL of
+    every unique image in document order. Needs no network, so it can run in
+    a worker process while the downloads happen elsewhere.
+    """
+    urls = []
     for img in soup.find_all("img"):
         src = img.get("src")
         if not src:
@@ -111,11 +455,25 @@ def process_images(soup: BeautifulSoup, page_slug: str, base_url: str) -> None:
 
         # Make absolute URL
         abs_url = urljoin(base_url, src)
-
-        # Download and update
-        local_path = download_image(abs_url, page_slug)
-        if local_path:
+        urls.append(abs_url)
+        local_path = local_image_path(abs_url, page_slug)
+        if local_path and abs_url not in failed:
             img["src"] = local_path
+    return list(dict.fromkeys(urls))
+
+
+def download_images(
+    urls: list[str],
+    page_slug: str,
+    workers: int = DEFAULT_IMAGE_WORKERS,
+    journal: Optional[RunJournal] = None,
+) -> list[Optional[str]]:
+    """Download images on the fetch engine's thread pool under its per-host rate limit.
+
+    Returns the local path of every URL, None where the download failed.
+    """
+    fetch = inherit_output(lambda url: download_image(url, page_slug, journal))
+    return get_engine().map(fetch, urls, workers=workers)
 
 
 def html_to_markdown(soup: BeautifulSoup) -> str:
@@ -161,6 +519,17 @@ last_imported: {timestamp}
     return front_matter
 
 
+def keep_last_imported(page_slug: str, content: str) -> str:
+    """Return the existing page instead of ``content`` if only last_imported differs."""
+    try:
+        existing = (PAGES_DIR / f"{page_slug}.md").read_text(encoding="utf-8")
+    except OSError:
+        return content
+    if LAST_IMPORTED_PATTERN.sub("", existing) == LAST_IMPORTED_PATTERN.sub("", content):
+        return existing
+    return content
+
+
 def write_page(page_slug: str, content: str, force: bool = False) -> None:
     """Write page to pages/<slug>.md with idempotent behavior."""
     PAGES_DIR.mkdir(parents=True, exist_ok=True)
@@ -171,33 +540,24 @@ def write_page(page_slug: str, content: str, force: bool = False) -> None:
         existing = output_file.read_text(encoding="utf-8")
         if existing == content:
             print(f"  No changes: {output_file}")
+            count("pages_unchanged")
             return
 
-    output_file.write_text(content, encoding="utf-8")
+    with timer("write"):
+        output_file.write_text(content, encoding="utf-8")
+    count("pages_written")
+    count("bytes_written", len(content.encode("utf-8")))
     print(f"  Written: {output_file}")
 
 
-def import_page(url: str, page_filter: Optional[Sequence[str]], force: bool, delay: float) -> None:
-    """Import a single page from Google Sites."""
-    # Extract page identifier from URL
-    parsed = urlparse(url)
-    page_path = parsed.path.strip("/")
-
-    # Create slug
-    if page_path and page_path != "view/msdsoftmatter":
-        page_slug = slugify(page_path.split("/")[-1])
-    else:
-        page_slug = "home"
-
-    # Apply filter
-    if page_filter and page_slug not in page_filter:
-        return
-
-    print(f"\nProcessing: {page_slug}")
+def convert_page(html: str, url: str, page_slug: str, failed: Collection[str] = ()) -> tuple[str, str, list[str]]:
+    """Parse, clean and convert one page; return (title, Markdown, image URLs).
 
-    # Fetch HTML
-    html = fetch_with_cache(url, force=force)
-    soup = BeautifulSoup(html, "html.parser")
+    Images are linked at their local paths, except those in ``failed``.
+    Pure CPU work, so the pipeline runs it in worker processes.
+    """
+    with timer("parse"):
+        soup = parse_html(html)
 
     # Extract title
     title = extract_title(soup)
@@ -205,35 +565,176 @@ def import_page(url: str, page_filter: Optional[Sequence[str]], force: bool, del
     # Find main content (Google Sites structure varies)
     # Try to find the main content area
     content_div = soup.find("div", class_=re.compile(r"sites-canvas-main")) or soup.body
+    if not content_div:
+        return title, "Content not found.", []
 
-    if content_div:
+    with timer("convert"):
         # Clean HTML
         clean_html(content_div)
 
-        # Process images
-        process_images(content_div, page_slug, url)
+        # Link images to their local copies
+        image_urls = link_images(content_div, page_slug, url, failed)
 
         # Convert to Markdown
         markdown = html_to_markdown(content_div)
-    else:
-        markdown = "Content not found."
+    return title, markdown, image_urls
+
+
+def prepare_page(
+    url: str,
+    page_slug: str,
+    force: bool,
+    max_age: Optional[float] = None,
+    image_workers: int = DEFAULT_IMAGE_WORKERS,
+    journal: Optional[RunJournal] = None,
+    convert: Callable[..., tuple[str, str, list[str]]] = convert_page,
+) -> Optional[tuple[str, str, str, list[Optional[str]]]]:
+    """Fetch, convert and download the images of one page, without writing it.
+
+    Returns (conversion key, title, Markdown, local image paths), or None
+    when the conversion cache shows the written page is up to date. A page
+    with failed downloads is converted again so those images keep their
+    remote src.
+    """
+    html = fetch_with_cache(url, force=force, max_age=max_age)
 
+    # Skip parsing and conversion if nothing the output depends on changed
+    key = conversion_key(html, url, page_slug)
+    if not force and get_conversion_cache().is_current(page_slug, key):
+        print(f"  Up to date: {PAGES_DIR / f'{page_slug}.md'}")
+        count("conversion_cache_hits")
+        return None
+    count("conversion_cache_misses")
+
+    title, markdown, image_urls = convert(html, url, page_slug)
+    images = download_images(image_urls, page_slug, workers=image_workers, journal=journal)
+    failed = [image_url for image_url, local_path in zip(image_urls, images) if local_path is None]
+    if failed:
+        title, markdown, _ = convert(html, url, page_slug, failed)
+    return key, title, markdown, images
+
+
+def finish_page(
+    url: str, page_slug: str, key: str, title: str, markdown: str, images: list[Optional[str]], force: bool
+) -> None:
+    """Add front matter to a prepared page, write it and record its conversion."""
     # Generate front matter
     permalink = f"/{page_slug}/" if page_slug != "home" else "/"
     front_matter = generate_front_matter(title, permalink, url)
 
-    # Combine
-    full_content = front_matter + markdown
+    # Combine, keeping the previous last_imported if the page did not change
+    full_content = keep_last_imported(page_slug, front_matter + markdown)
 
     # Write to disk
     write_page(page_slug, full_content, force=force)
 
-    # Polite delay
-    if delay > 0:
-        time.sleep(delay)
+    # A page with failed images is converted again next run so they are retried
+    if None not in images:
+        get_conversion_cache().record(page_slug, key, full_content, images)
+
+
+def _convert_in_worker(*args) -> tuple[tuple[str, str, list[str]], dict]:
+    return convert_page(*args), get_metrics().drain()
 
 
-def discover_pages(base_url: str, force: bool) -> list[str]:
+def fetch_workers(engine: FetchEngine, image_workers: int) -> int:
+    """Threads fetching pages ahead of conversion.
+
+    Threads beyond what the host bucket can serve would only queue on it,
+    so the pool covers the burst plus one second of requests, and at least
+    ``image_workers`` pages (the whole pool when the rate is unlimited).
+    """
+    rate, burst = engine.limiter.rate, engine.limiter.burst
+    bucket = burst + math.ceil(rate) if rate > 0 else 0
+    return max(1, image_workers, bucket)
+
+
+def import_pages(
+    targets: Sequence[tuple[str, Optional[str]]],
+    force: bool,
+    journal: RunJournal,
+    max_age: Optional[float] = None,
+    image_workers: int = DEFAULT_IMAGE_WORKERS,
+    jobs: int = DEFAULT_JOBS,
+) -> list[str]:
+    """Import (slug, URL) pages as a pipeline and return the slugs that failed.
+
+    Up to fetch_workers() pages are in flight on threads that fetch pages
+    and download images under the engine's per-host rate limit, while
+    parsing and conversion run in ``jobs`` worker processes (in the page
+    threads when ``jobs`` is 1). Pages are written, journaled and their
+    buffered output printed strictly in ``targets`` order, so the log and
+    the files match a serial run. A failing page is journaled and the rest
+    continue; pages dropped by the slug filter are not journaled at all.
+    """
+    output = PageOutput(sys.stdout)
+    # Pages dropped by the slug filter (a URL whose own slug differs) are not imported
+    targets = [(slug, url) for slug, url in targets if not url or slug_for_url(url, root_slug="home") == slug]
+
+    # Spawned, not forked: the parent already runs fetch threads holding locks.
+    # Starting a worker costs far more than converting one page, so a pool
+    # is only worth it for large sites.
+    jobs = min(jobs, len(targets))
+    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) if jobs > 1 else None
+
+    def convert(*args) -> tuple[str, str, list[str]]:
+        if pool is None:
+            return convert_page(*args)
+        result, worker_metrics = pool.submit(_convert_in_worker, *args).result()
+        get_metrics().merge(worker_metrics)
+        return result
+
+    def prepare(slug: str, url: str) -> tuple[io.StringIO, Optional[tuple], Optional[Exception]]:
+        buffer = io.StringIO()
+        with output.capture(buffer):
+            print(f"\nProcessing: {slug}")
+            try:
+                return buffer, prepare_page(url, slug, force, max_age, image_workers, journal, convert), None
+            except Exception as e:  # noqa: BLE001 - isolate the failure to this page
+                return buffer, None, e
+
+    failed: list[str] = []
+    workers = fetch_workers(get_engine(), image_workers)
+    with redirect_stdout(output), ThreadPoolExecutor(max_workers=workers) as threads:
+        futures = {
+            slug: threads.submit(prepare, slug, url)
+            for slug, url in targets
+            if url and journal.page_status(slug) != "done"
+        }
+        try:
+            for slug, url in targets:
+                if not url:
+                    print(f"[warn] No URL for slug '{slug}', skipping")
+                    continue
+                if slug not in futures:
+                    print(f"\nSkipping: {slug} (done in resumed run)")
+                    continue
+
+                buffer, prepared, error = futures[slug].result()
+                print(buffer.getvalue(), end="")
+                if prepared and not error:
+                    try:
+                        finish_page(url, slug, *prepared, force=force)
+                    except Exception as e:  # noqa: BLE001
+                        error = e
+                if error:
+                    print(f"  ✗ Failed: {slug}: {error}")
+                    journal.record_page(slug, url, "failed", error=str(error))
+                    failed.append(slug)
+                elif journal.failed_images(slug):
+                    journal.record_page(slug, url, "partial", error=f"{journal.failed_images(slug)} image(s) failed")
+                    failed.append(slug)
+                else:
+                    journal.record_page(slug, url, "done")
+        finally:
+            for future in futures.values():
+                future.cancel()
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    return failed
+
+
+def discover_pages(base_url: str, force: bool, max_age: Optional[float] = None) -> list[str]:
     """
     Discover pages from the Google Site.
 
@@ -242,14 +743,14 @@ def discover_pages(base_url: str, force: bool) -> list[str]:
     Additional slugs provided via --pages are appended later.
     """
     print("Discovering pages...")
-    html = fetch_with_cache(base_url, force=force)
-    soup = BeautifulSoup(html, "html.parser")
+    html = fetch_with_cache(base_url, force=force, max_age=max_age)
+    with timer("parse"):
+        (hrefs,) = select_attributes(html, [("a[href]", "href")])
 
     pages = [base_url]
 
     # Look for navigation links
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
+    for href in hrefs:
         if "sites.google.com/view/msdsoftmatter" in href:
             full_url = urljoin(base_url, href)
             if full_url not in pages:
@@ -280,7 +781,13 @@ def main() -> None:
 Examples:
   %(prog)s                              # Import all discovered pages
   %(prog)s --pages home about contact   # Import specific pages by slug
-  %(prog)s --force --delay 1            # Force re-import with 1s delay
+  %(prog)s --force --rate 1             # Force re-import at 1 request/s per host
+  %(prog)s --resume                     # Continue the last run, retrying only failed pages/images
+  %(prog)s --max-age 0                  # Revalidate every cached page (304s are cheap)
+  %(prog)s --max-age 86400              # Revalidate pages cached more than a day ago
+  %(prog)s --jobs 4                     # Convert pages in 4 processes (large sites only)
+  %(prog)s --metrics-json tmp/import.json  # Dump phase timings and counters at exit
+  %(prog)s --profile cprofile --image-workers 1  # Write a .prof file and hotspot summary
   %(prog)s --help                       # Show this help message
 """,
     )
@@ -296,50 +803,114 @@ Examples:
         action="store_true",
         help="Force re-fetch and re-write even if cached/unchanged",
     )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        metavar="RPS",
+        help=f"Requests per second per host, 0 = unlimited (default: {DEFAULT_RATE})",
+    )
     parser.add_argument(
         "--delay",
         type=float,
-        default=DEFAULT_DELAY,
+        default=None,
         metavar="SECONDS",
-        help=f"Delay between requests in seconds (default: {DEFAULT_DELAY})",
+        help="Deprecated: same as --rate 1/SECONDS",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Revalidate cached pages older than this with a conditional GET (default: trust cache)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue the run recorded in {CACHE_DIR / JOURNAL_NAME}: skip finished pages, retry failed ones",
+    )
+    parser.add_argument(
+        "--image-workers",
+        type=int,
+        default=DEFAULT_IMAGE_WORKERS,
+        metavar="N",
+        help=f"Parallel image downloads per page (default: {DEFAULT_IMAGE_WORKERS})",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        metavar="N",
+        help=(
+            "Processes parsing and converting pages while the next ones are fetched; worker start-up "
+            f"outweighs conversion on small sites (default: {DEFAULT_JOBS}, convert on the fetch threads)"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write per-phase timings and counters (bytes, cache hits, retries) to PATH at exit",
     )
 
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
+    write_metrics_at_exit(args.metrics_json, "import_google_site")
+    start_profile(args, "import_google_site")
 
     print("MSD Soft Matter Lab - Google Sites Importer")
     print(f"Source: {BASE_URL}")
-    print(f"Delay: {args.delay}s, Force: {args.force}")
+    if args.delay is not None:
+        args.rate = 1 / args.delay if args.delay > 0 else 0
+    get_engine(rate=args.rate)
+    print(f"Rate: {args.rate or 'unlimited'} req/s per host, Force: {args.force}")
 
     if args.pages:
         print(f"Filter: {', '.join(args.pages)}")
 
+    options = {"pages": args.pages, "force": args.force, "max_age": args.max_age}
+    journal_path = CACHE_DIR / JOURNAL_NAME
+    journal = RunJournal.resume(journal_path, options) if args.resume else RunJournal.start(journal_path, options)
+    failed: list[str] = []
+
     try:
         # Discover pages
-        discovered = discover_pages(BASE_URL, force=args.force)
+        discovered = discover_pages(BASE_URL, force=args.force, max_age=args.max_age)
         print(f"\nDiscovered {len(discovered)} page(s)")
 
         url_map = ensure_slug_pages(discovered, args.pages or [], base_url=BASE_URL)
         target_slugs = args.pages if args.pages else list(url_map.keys())
 
-        # Import each page
-        for slug in target_slugs:
-            url = url_map.get(slug)
-            if not url:
-                print(f"[warn] No URL for slug '{slug}', skipping")
-                continue
-            import_page(url, [slug], args.force, args.delay)
-
-        print("\n✓ Import complete!")
-        print(f"  Pages written to: {PAGES_DIR.absolute()}")
-        print(f"  Images saved to: {ASSETS_DIR.absolute()}")
+        # Import the pages; a failing page is journaled and the run moves on
+        failed = import_pages(
+            [(slug, url_map.get(slug)) for slug in target_slugs],
+            args.force,
+            journal,
+            max_age=args.max_age,
+            image_workers=args.image_workers,
+            jobs=max(1, args.jobs),
+        )
 
     except KeyboardInterrupt:
         print("\n\n✗ Import interrupted by user")
+        print(f"  Progress saved to {journal_path}; continue with --resume")
         sys.exit(1)
     except Exception as e:
         print(f"\n✗ Import failed: {e}")
+        print(f"  Progress saved to {journal_path}; continue with --resume")
+        sys.exit(1)
+
+    if failed:
+        print(f"\n✗ Import finished with {len(failed)} failed page(s): {', '.join(failed)}")
+        print(f"  Retry just those with: --resume (journal: {journal_path})")
         sys.exit(1)
 
+    print("\n✓ Import complete!")
+    print(f"  Pages written to: {PAGES_DIR.absolute()}")
+    print(f"  Images saved to: {ASSETS_DIR.absolute()}")
 
 if __name__ == "__main__":
     main()
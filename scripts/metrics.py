@@ -0,0 +1,133 @@
+"""
+Per-phase timers and counters shared by the migration scripts.
+
+Scripts time their phases (fetch, parse, convert, download, rewrite, write,
+...) with ``timer(phase)`` and bump named counters with ``count(name, n)``;
+fetch_engine.py and downloads.py record requests, retries, rate-limit waits
+and bytes downloaded for every caller. Counters named ``<cache>_hits`` and
+``<cache>_misses`` also produce a hit ratio per cache.
+
+Phase seconds are summed over every call, so a phase run on several threads
+can add up to more than the wall time. Process pool workers ``drain()``
+their metrics and the parent ``merge()``s them. ``--metrics-json PATH`` (see
+``write_metrics_at_exit``) dumps everything when the script exits, including
+on ``sys.exit(1)``.
+
+Requirements: Python 3.12+
+"""
+
+import atexit
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+METRICS_VERSION = 1
+
+
+class Metrics:
+    """Thread-safe accumulator of phase timings and counters for one process."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, list[float]] = {}  # phase -> [calls, seconds]
+        self.counters: Counter[str] = Counter()
+        self._listeners: list[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """Add the duration of the ``with`` block to ``phase``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                totals = self.phases.setdefault(phase, [0, 0.0])
+                totals[0] += 1
+                totals[1] += elapsed
+            for listener in self._listeners:
+                listener(phase)
+
+    def add_phase_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(phase)`` whenever a timed phase ends (used by profiling.py)."""
+        self._listeners.append(listener)
+
+    def count(self, name: str, amount: int | float = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def drain(self) -> dict[str, Any]:
+        """Return and reset the phases and counters recorded so far (for worker processes)."""
+        with self._lock:
+            drained = {"phases": self.phases, "counters": dict(self.counters)}
+            self.phases = {}
+            self.counters = Counter()
+        return drained
+
+    def merge(self, drained: dict[str, Any]) -> None:
+        """Add phases and counters drained from another process."""
+        with self._lock:
+            for phase, (calls, seconds) in drained["phases"].items():
+                totals = self.phases.setdefault(phase, [0, 0.0])
+                totals[0] += calls
+                totals[1] += seconds
+            self.counters.update(drained["counters"])
+
+    def cache_hit_ratios(self) -> dict[str, float]:
+        """Hit ratio per cache, from its ``<cache>_hits``/``<cache>_misses`` counters."""
+        ratios = {}
+        for name in self.counters:
+            if name.endswith("_hits"):
+                cache = name.removesuffix("_hits")
+                total = self.counters[name] + self.counters[f"{cache}_misses"]
+                if total:
+                    ratios[cache] = self.counters[name] / total
+        return ratios
+
+    def to_dict(self, script: str) -> dict[str, Any]:
+        with self._lock:
+            phases = {phase: {"calls": calls, "seconds": seconds} for phase, (calls, seconds) in self.phases.items()}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "version": METRICS_VERSION,
+            "script": script,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "wall_seconds": time.perf_counter() - self.started,
+            "phases": phases,
+            "counters": counters,
+            "cache_hit_ratio": self.cache_hit_ratios(),
+        }
+
+    def write_json(self, path: Path, script: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(script), indent=2) + "\n", encoding="utf-8")
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics every script and helper module records into."""
+    return _metrics
+
+
+def timer(phase: str):
+    """Shortcut for ``get_metrics().timer(phase)``."""
+    return _metrics.timer(phase)
+
+
+def count(name: str, amount: int | float = 1) -> None:
+    """Shortcut for ``get_metrics().count(name, amount)``."""
+    _metrics.count(name, amount)
+
+
+def write_metrics_at_exit(path: Optional[Path], script: str) -> None:
+    """Dump the process metrics to ``path`` (if given) when the interpreter exits."""
+    if path is not None:
+        atexit.register(_metrics.write_json, path, script)
@@ -39,6 +39,7 @@ OPTIONS:
   -r, --retries COUNT   Number of retries on failure (default: ${RETRY_COUNT})
   -d, --depth LEVEL     Maximum recursion depth (default: infinite)
   --user-agent STRING   Custom User-Agent header (default: "${USER_AGENT}")
+  --link-mode MODE      Stage files as copy|hardlink|reflink|symlink (default: cheapest safe mode)
   --no-postprocess      Skip postprocessing step
 
 EXAMPLES:
@@ -76,6 +77,7 @@ error() {
 TARGET_URL=""
 MAX_DEPTH=""
 NO_POSTPROCESS=false
+LINK_MODE=""
 
 while [[ $# -gt 0 ]]; do
     case "$1" in
@@ -103,6 +105,11 @@ while [[ $# -gt 0 ]]; do
             [[ -z "$USER_AGENT" ]] && error "--user-agent requires a value"
             shift 2
             ;;
+        --link-mode)
+            LINK_MODE="${2:-}"
+            [[ -z "$LINK_MODE" ]] && error "--link-mode requires a value"
+            shift 2
+            ;;
         --no-postprocess)
             NO_POSTPROCESS=true
             shift
@@ -171,7 +178,21 @@ POSTPROCESS_SCRIPT="${SCRIPT_DIR}/postprocess_mirror.py"
 log "Running postprocessing..."
 mkdir -p "${STAGING_DIR}"
 
-if ! python3 "${POSTPROCESS_SCRIPT}" "${RAW_DIR}" "${STAGING_DIR}"; then
+# Reuse unchanged files from the most recent earlier run, if any
+POSTPROCESS_ARGS=("${RAW_DIR}" "${STAGING_DIR}")
+PREVIOUS_STAGING=""
+for run_dir in "${TMP_DIR}"/*/; do
+    candidate="${run_dir%/}/staging"
+    [[ "$candidate" == "$STAGING_DIR" ]] && continue
+    [[ -f "${candidate}/.postprocess-manifest.json" ]] && PREVIOUS_STAGING="$candidate"
+done
+if [[ -n "$PREVIOUS_STAGING" ]]; then
+    log "Incremental postprocessing against ${PREVIOUS_STAGING}"
+    POSTPROCESS_ARGS+=(--previous "${PREVIOUS_STAGING}")
+fi
+[[ -n "$LINK_MODE" ]] && POSTPROCESS_ARGS+=(--link-mode "${LINK_MODE}")
+
+if ! python3 "${POSTPROCESS_SCRIPT}" "${POSTPROCESS_ARGS[@]}"; then
     error "postprocess_mirror.py failed"
 fi
 
@@ -8,25 +8,78 @@ Takes a raw wget mirror directory and produces a staging tree with:
 - Clean directory structure suitable for deployment
 
 Usage:
-    python3 postprocess_mirror.py <raw_dir> <staging_dir>
+    python3 postprocess_mirror.py <raw_dir> <staging_dir> [--jobs N] [--previous DIR]
+                                  [--link-mode {copy,hardlink,reflink,symlink}]
+                                  [--rewrite {splice,soup}] [--metrics-json PATH]
+                                  [--profile {cprofile,tracemalloc}]
 
 Arguments:
     raw_dir     Directory containing raw wget output
     staging_dir Output directory for processed files
 
+Incremental runs:
+    A .postprocess-manifest.json in the staging tree records source hashes,
+    destinations and staged output hashes. With --previous (or when re-running
+    into a staging tree that already has a manifest), unchanged files are
+    hardlinked or left in place, and HTML is re-rewritten only if its source
+    changed or the set of mirrored paths changed.
+
+Links rewritten:
+    href/src on a, link, script, img, source, video and audio; srcset on
+    img/source; video poster; data-* attributes whose value is a file path
+    (data-srcset as a srcset); url() in <style> blocks and in staged .css
+    files. Every reference is counted as resolved (found in the mirror),
+    as-is (external, anchor or data: URL) or dangling (not mirrored; left
+    untouched), and the totals are logged.
+
+Rewrite modes:
+    splice (default) tokenizes each HTML file as bytes, records the offsets
+    of link attribute values and <style> url() references, and splices the
+    changed values into the original buffer (memory-mapped above
+    MMAP_THRESHOLD), so all other markup is kept byte for byte. soup parses
+    the file with BeautifulSoup and re-serializes the whole tree.
+
+Link modes:
+    Files are staged from raw/ with --link-mode: copy, hardlink, reflink
+    (copy-on-write clone, Linux FICLONE) or symlink. By default the cheapest
+    mode that keeps staged files independent is probed on the filesystem:
+    reflink, then hardlink, then copy. Rewritten HTML is always written to
+    a new file and renamed over the staged one, so raw/ is never modified
+    through a link.
+
+Metrics:
+    --metrics-json PATH writes the time spent staging, rewriting and writing
+    the manifest, files staged and reused, and link totals when the run ends.
+
 Requirements:
     - Python >= 3.12
     - beautifulsoup4 (pip3 install beautifulsoup4)
 """
 
 import argparse
+import hashlib
+import html
+import json
 import logging
+import mmap
+import os
+import re
 import shutil
 import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+from html_backend import parse_html
+from metrics import count, timer, write_metrics_at_exit
+from profiling import add_profile_arguments, start_profile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 # Configure logging
 logging.basicConfig(
@@ -36,14 +89,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MANIFEST_NAME = ".postprocess-manifest.json"
+MANIFEST_VERSION = 2
+LINK_MODES = ("copy", "hardlink", "reflink", "symlink")
+FICLONE = 0x40049409  # Linux ioctl: share src's extents with dest
+REWRITE_MODES = ("splice", "soup")
+MMAP_THRESHOLD = 1 << 20  # map HTML files at least this large instead of reading them
+
+# Link-bearing attributes per tag, as rewritten in both modes; data-*
+# attributes on any tag are rewritten too when their value is a file path
+LINK_ATTRIBUTES = {
+    "a": ("href",),
+    "link": ("href",),
+    "script": ("src",),
+    "img": ("src", "srcset"),
+    "source": ("src", "srcset"),
+    "video": ("src", "poster"),
+    "audio": ("src",),
+}
+SRCSET_ATTRIBUTES = {"srcset", "data-srcset"}
+FILE_PATH_PATTERN = re.compile(r"[^\s<>\"']*\.[A-Za-z][A-Za-z0-9]{0,4}(?:[?#]\S*)?")
+LINK_STATES = ("resolved", "as-is", "dangling")
+CSS_URL_PATTERN = re.compile(r'url\(["\']?([^"\')]+)["\']?\)')
+
+# Byte-level HTML tokens: comments, raw-text <script>/<style> elements (whose
+# bodies are not markup) and start tags. Quoted attribute values may hold ">".
+_ATTRS = rb"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+HTML_TOKEN_PATTERN = re.compile(
+    rb"<!--.*?-->"
+    rb"|<(?P<raw>script|style)(?P<raw_attrs>(?:\s" + _ATTRS + rb")?)>(?P<body>.*?)</(?P=raw)\s*>"
+    rb"|<(?P<tag>[a-zA-Z][^\s/>]*)(?P<attrs>" + _ATTRS + rb")>",
+    re.DOTALL | re.IGNORECASE,
+)
+HTML_ATTRIBUTE_PATTERN = re.compile(
+    rb"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+
+
+def is_rewritten(path: Path) -> bool:
+    """Return True for files the rewrite phase edits (HTML and CSS)."""
+    return path.suffix.lower() in {".html", ".htm", ".css"}
+
+
+def file_sha256(path: Path) -> str:
+    """Stream a file through SHA-256."""
+    with path.open("rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def load_manifest(staging_dir: Path | None) -> dict:
+    """Load a previous run's manifest; missing or outdated manifests are empty."""
+    if staging_dir is None:
+        return {}
+    try:
+        manifest = json.loads((staging_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def reflink(src: Path, dest: Path) -> None:
+    """Clone src to dest as a copy-on-write reflink; OSError if unsupported."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError("reflinks are only supported on Linux")
+    try:
+        with src.open("rb") as src_fh, dest.open("wb") as dest_fh:
+            fcntl.ioctl(dest_fh.fileno(), FICLONE, src_fh.fileno())
+    except OSError:
+        dest.unlink(missing_ok=True)
+        raise
+    shutil.copystat(src, dest)
+
+
+def stage_file(src: Path, dest: Path, mode: str) -> None:
+    """Materialize src at dest using the given link mode."""
+    if mode == "hardlink":
+        os.link(src, dest)
+    elif mode == "reflink":
+        reflink(src, dest)
+    elif mode == "symlink":
+        dest.symlink_to(src)
+    else:
+        shutil.copy2(src, dest)
+
+
+def detect_link_mode(sample: Path, staging_dir: Path) -> str:
+    """Cheapest mode that keeps staged files independent: reflink, hardlink or copy.
+
+    Symlinks are never chosen automatically since they break when raw/ moves.
+    """
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=staging_dir, prefix=".link-probe-") as probe_dir:
+        for mode in ("reflink", "hardlink"):
+            try:
+                stage_file(sample, Path(probe_dir) / mode, mode)
+            except OSError:
+                continue
+            return mode
+    return "copy"
+
+
+def write_replacing(path: Path, content: str) -> None:
+    """Write content to a new file renamed over path, breaking any link to raw/."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def write_spliced(path: Path, buffer, splices: list[tuple[int, int, bytes]]) -> None:
+    """Write buffer with each (start, end) span replaced, renamed over path like write_replacing."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("wb") as fh:
+        position = 0
+        for start, end, replacement in splices:
+            fh.write(buffer[position:start])
+            fh.write(replacement)
+            position = end
+        fh.write(buffer[position:])
+    os.replace(tmp_path, path)
+
 
 class MirrorPostprocessor:
     """Process raw wget mirror into clean staging tree."""
 
-    def __init__(self, raw_dir: Path, staging_dir: Path) -> None:
+    def __init__(
+        self,
+        raw_dir: Path,
+        staging_dir: Path,
+        jobs: int = 1,
+        previous_dir: Path | None = None,
+        link_mode: str | None = None,
+        rewrite_mode: str = "splice",
+    ) -> None:
+        if link_mode is not None and link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}")
+        if rewrite_mode not in REWRITE_MODES:
+            raise ValueError(f"Unknown rewrite mode: {rewrite_mode}")
         self.raw_dir = raw_dir.resolve()
         self.staging_dir = staging_dir.resolve()
+        self.jobs = max(1, jobs)
+        self.link_mode = link_mode  # None: detect on the first staged file
+        self.rewrite_mode = rewrite_mode
         self.asset_map: dict[str, str] = {}  # old_path -> new_path
+        self.name_index: dict[str, str] = {}  # basename -> new_path of preferred candidate
+        self._resolved: dict[str, str | None] = {}  # memo shared across all HTML/CSS files
+        self.link_counts: Counter[str] = Counter()  # LINK_STATES -> references seen
+
+        # Incremental state: the previous run's staging tree and manifest
+        if previous_dir is None and (self.staging_dir / MANIFEST_NAME).exists():
+            previous_dir = self.staging_dir
+        self.previous_dir = previous_dir.resolve() if previous_dir else None
+        self.previous_manifest = load_manifest(self.previous_dir)
+        self.source_hashes: dict[str, str] = {}  # old_path -> sha256 of raw file
+        self.reused: set[str] = set()  # new_paths taken from the previous run
 
     def run(self) -> None:
         """Execute full postprocessing workflow."""
@@ -56,31 +256,149 @@ class MirrorPostprocessor:
         self.staging_dir.mkdir(parents=True, exist_ok=True)
 
         # Phase 1: Copy and organize files
-        self._organize_files()
+        with timer("stage"):
+            self._organize_files()
 
-        # Phase 2: Rewrite HTML links
-        self._rewrite_html_files()
+        # Phase 2: Rewrite HTML and CSS links
+        with timer("rewrite"):
+            self._rewrite_files()
+
+        # Phase 3: Record hashes so the next run can skip unchanged files
+        with timer("write"):
+            self._write_manifest()
 
         logger.info("Postprocessing complete")
 
     def _organize_files(self) -> None:
-        """Copy files from raw to staging with logical organization."""
+        """Stage files from raw to staging with logical organization.
+
+        Files whose content and destination match the previous run's manifest
+        are hardlinked from the previous staging tree (or left in place when
+        re-running into the same tree); the rest are staged with link_mode.
+        """
         logger.info("Organizing files...")
 
-        for src_path in self.raw_dir.rglob("*"):
-            if not src_path.is_file():
-                continue
+        sources = [path for path in self.raw_dir.rglob("*") if path.is_file()]
+        if self.link_mode is None and sources:
+            self.link_mode = detect_link_mode(sources[0], self.staging_dir)
+        logger.info(f"Staging with link mode: {self.link_mode or 'copy'}")
 
+        # Destinations depend only on paths, so the full map is known up front
+        for src_path in sources:
             rel_path = src_path.relative_to(self.raw_dir)
             dest_path = self._map_destination(rel_path)
+            self.asset_map[str(rel_path)] = str(dest_path.relative_to(self.staging_dir))
+        map_unchanged = self.previous_manifest.get("asset_map_sha256") == self._asset_map_digest()
+
+        for src_path in sources:
+            old_path = str(src_path.relative_to(self.raw_dir))
+            new_path = self.asset_map[old_path]
+            dest_path = self.staging_dir / new_path
+            self.source_hashes[old_path] = file_sha256(src_path)
+
+            # Rewritten HTML/CSS is only reusable if every link resolves as before
+            if (map_unchanged or not is_rewritten(dest_path)) and self._reuse_previous(old_path, dest_path):
+                self.reused.add(new_path)
+                continue
 
+            self.reused.discard(new_path)
             dest_path.parent.mkdir(parents=True, exist_ok=True)
+            dest_path.unlink(missing_ok=True)  # never write through a hardlink
+            self._stage(src_path, dest_path)
+
+        self._build_name_index()
+        logger.info(f"Organized {len(self.asset_map)} files ({len(self.reused)} unchanged)")
+        count("files_staged", len(self.asset_map) - len(self.reused))
+        if self.previous_dir is not None:
+            count("previous_run_hits", len(self.reused))
+            count("previous_run_misses", len(self.asset_map) - len(self.reused))
+
+    def _stage(self, src_path: Path, dest_path: Path) -> None:
+        """Stage one file, falling back to copies if the link mode stops working."""
+        try:
+            stage_file(src_path, dest_path, self.link_mode or "copy")
+        except OSError as e:
+            if self.link_mode in (None, "copy"):
+                raise
+            logger.warning(f"{self.link_mode} failed for {src_path.name} ({e}); copying from now on")
+            self.link_mode = "copy"
+            dest_path.unlink(missing_ok=True)
             shutil.copy2(src_path, dest_path)
 
-            # Track mapping for link rewriting
-            self.asset_map[str(rel_path)] = str(dest_path.relative_to(self.staging_dir))
+    def _reuse_previous(self, old_path: str, dest_path: Path) -> bool:
+        """Link dest_path from the previous run if it holds this exact output."""
+        if self.previous_dir is None:
+            return False
+        new_path = self.asset_map[old_path]
+        previous_file = self.previous_manifest.get("files", {}).get(old_path, {})
+        previous_output = self.previous_manifest.get("outputs", {}).get(new_path, {})
+        if previous_file.get("sha256") != self.source_hashes[old_path]:
+            return False
+        if previous_output.get("source") != old_path:
+            return False
 
-        logger.info(f"Organized {len(self.asset_map)} files")
+        previous_path = self.previous_dir / new_path
+        try:
+            if previous_path.stat().st_size != previous_output.get("size"):
+                return False
+            if self.previous_dir != self.staging_dir:
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                dest_path.unlink(missing_ok=True)
+                os.link(previous_path, dest_path)
+        except OSError:
+            return False
+        return True
+
+    def _asset_map_digest(self) -> str:
+        """Fingerprint the path mapping that link resolution depends on."""
+        encoded = json.dumps(sorted(self.asset_map.items())).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _write_manifest(self) -> None:
+        """Persist source hashes, destinations and staged output hashes."""
+        outputs: dict[str, dict] = {}
+        for old_path, new_path in self.asset_map.items():
+            staged = self.staging_dir / new_path
+            if new_path in self.reused and new_path in self.previous_manifest.get("outputs", {}):
+                digest = self.previous_manifest["outputs"][new_path]["sha256"]
+            elif is_rewritten(staged):
+                digest = file_sha256(staged)
+            else:
+                digest = self.source_hashes[old_path]
+            # Later sources overwrite earlier ones, mirroring the copy order
+            outputs[new_path] = {"source": old_path, "sha256": digest, "size": staged.stat().st_size}
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "asset_map_sha256": self._asset_map_digest(),
+            "files": {
+                old_path: {"sha256": self.source_hashes[old_path], "dest": new_path}
+                for old_path, new_path in self.asset_map.items()
+            },
+            "outputs": outputs,
+        }
+        manifest_path = self.staging_dir / MANIFEST_NAME
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        logger.debug(f"Wrote manifest {manifest_path}")
+
+    def _build_name_index(self) -> None:
+        """Index asset_map by basename for O(1) fallback lookups.
+
+        When several files share a name, the shallowest original path wins,
+        then the lexicographically smallest, so the choice does not depend on
+        filesystem walk order.
+        """
+        candidates: dict[str, list[str]] = {}
+        for old_path in self.asset_map:
+            candidates.setdefault(Path(old_path).name, []).append(old_path)
+
+        self.name_index = {}
+        self._resolved = {}
+        for name, old_paths in candidates.items():
+            preferred = min(old_paths, key=lambda path: (len(Path(path).parts), path))
+            self.name_index[name] = self.asset_map[preferred]
+            if len(old_paths) > 1:
+                logger.debug(f"{len(old_paths)} files named {name}; preferring {preferred}")
 
     def _map_destination(self, rel_path: Path) -> Path:
         """Determine staging destination for a file."""
@@ -113,53 +431,169 @@ class MirrorPostprocessor:
         # Other files - preserve structure
         return self.staging_dir / rel_path
 
-    def _rewrite_html_files(self) -> None:
-        """Rewrite links in all HTML files to root-relative paths."""
-        logger.info("Rewriting HTML links...")
-
-        html_files = list(self.staging_dir.rglob("*.html"))
-        html_files.extend(self.staging_dir.rglob("*.htm"))
-
-        for html_path in html_files:
-            self._process_html_file(html_path)
+    def _rewrite_files(self) -> None:
+        """Rewrite links in all HTML and CSS files to root-relative paths."""
+        logger.info("Rewriting HTML and CSS links...")
+
+        files = [path for path in self.staging_dir.rglob("*") if is_rewritten(path) and path.is_file()]
+        skipped = len(files)
+        files = [path for path in files if str(path.relative_to(self.staging_dir)) not in self.reused]
+        skipped -= len(files)
+        if skipped:
+            logger.info(f"Skipping {skipped} unchanged HTML/CSS files")
+
+        if self.jobs > 1 and len(files) > 1:
+            self._rewrite_in_pool(files)
+        else:
+            for path in files:
+                self._process_file(path)
+
+        css_count = sum(path.suffix.lower() == ".css" for path in files)
+        logger.info(f"Processed {len(files) - css_count} HTML and {css_count} CSS files")
+        logger.info(", ".join(f"{self.link_counts[state]} {state}" for state in LINK_STATES) + " links")
+        count("files_rewritten", len(files))
+        for state in LINK_STATES:
+            count(f"links_{state}", self.link_counts[state])
+
+    def _rewrite_in_pool(self, files: list[Path]) -> None:
+        """Spread _process_file over a process pool.
+
+        The read-only asset map and name index are sent once per worker via
+        the pool initializer. Log records raised in workers are replayed into
+        this process's logger in file order, so output matches a serial run,
+        and their link counts are summed.
+        """
+        init_args = (
+            self.raw_dir,
+            self.staging_dir,
+            self.rewrite_mode,
+            self.asset_map,
+            self.name_index,
+            logger.getEffectiveLevel(),
+        )
+        chunksize = max(1, len(files) // (self.jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=self.jobs, initializer=_init_worker, initargs=init_args
+        ) as pool:
+            for records, link_counts in pool.map(_process_in_worker, files, chunksize=chunksize):
+                for record in records:
+                    logger.handle(record)
+                self.link_counts.update(link_counts)
+
+    def _process_file(self, path: Path) -> None:
+        """Rewrite links in one staged HTML or CSS file."""
+        if path.suffix.lower() == ".css":
+            self._process_css_file(path)
+        else:
+            self._process_html_file(path)
+
+    def _process_css_file(self, css_path: Path) -> None:
+        """Rewrite url() references in a relocated stylesheet."""
+        try:
+            css = css_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Failed to read {css_path}: {e}")
+            return
 
-        logger.info(f"Processed {len(html_files)} HTML files")
+        new_css = self._rewrite_css_urls(css)
+        if new_css != css:
+            write_replacing(css_path, new_css)
+            logger.debug(f"Rewrote url() references in {css_path.name}")
 
     def _process_html_file(self, html_path: Path) -> None:
         """Rewrite links in a single HTML file."""
+        if self.rewrite_mode == "splice":
+            self._splice_html_file(html_path)
+        else:
+            self._rewrite_html_tree(html_path)
+
+    def _splice_html_file(self, html_path: Path) -> None:
+        """Rewrite links by splicing new values into the original bytes."""
+        try:
+            with html_path.open("rb") as fh:
+                size = os.fstat(fh.fileno()).st_size
+                if size >= MMAP_THRESHOLD:
+                    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        splices = self._find_splices(buffer)
+                        if splices:
+                            write_spliced(html_path, buffer, splices)
+                else:
+                    buffer = fh.read()
+                    splices = self._find_splices(buffer)
+                    if splices:
+                        write_spliced(html_path, buffer, splices)
+        except OSError as e:
+            logger.warning(f"Failed to rewrite {html_path}: {e}")
+            return
+
+        if splices:
+            logger.debug(f"Rewrote {len(splices)} links in {html_path.name}")
+
+    def _find_splices(self, buffer) -> list[tuple[int, int, bytes]]:
+        """Return (start, end, replacement) for every link value that changes, in order."""
+        splices: list[tuple[int, int, bytes]] = []
+        for token in HTML_TOKEN_PATTERN.finditer(buffer):
+            if token.group("raw"):
+                tag, attrs = token.group("raw").lower(), "raw_attrs"
+            elif token.group("tag"):
+                tag, attrs = token.group("tag").lower(), "attrs"
+            else:
+                continue  # comment
+
+            tag_name = tag.decode("latin-1")
+            start, end = token.span(attrs)
+            if tag_name in LINK_ATTRIBUTES or buffer.find(b"data-", start, end) != -1:
+                for attr in HTML_ATTRIBUTE_PATTERN.finditer(buffer, start, end):
+                    name = attr.group(1).decode("latin-1").lower()
+                    if self._is_link_attribute(tag_name, name):
+                        splice = self._splice_attribute(attr, name)
+                        if splice:
+                            splices.append(splice)
+
+            if tag == b"style" and token.group("body"):
+                body = token.group("body")
+                try:
+                    css = body.decode("utf-8")
+                except UnicodeDecodeError:
+                    continue
+                new_css = self._rewrite_css_urls(css)
+                if new_css != css:
+                    splices.append((*token.span("body"), new_css.encode("utf-8")))
+        return splices
+
+    def _splice_attribute(self, attr: re.Match, name: str) -> tuple[int, int, bytes] | None:
+        """Splice for one attribute match if its rewritten value differs."""
+        group = next((index for index in (2, 3, 4) if attr.group(index) is not None), None)
+        if group is None:
+            return None
+        try:
+            value = html.unescape(attr.group(group).decode("utf-8"))
+        except UnicodeDecodeError:
+            return None
+        new_value = self._rewrite_attribute(name, value)
+        if new_value is None or new_value == value:
+            return None
+        encoded = html.escape(new_value).encode("utf-8")
+        if group == 4:
+            encoded = b'"' + encoded + b'"'  # unquoted values can't hold every character
+        return (*attr.span(group), encoded)
+
+    def _rewrite_html_tree(self, html_path: Path) -> None:
+        """Rewrite links by parsing the file and re-serializing the tree."""
         try:
             with html_path.open("r", encoding="utf-8") as f:
-                soup = BeautifulSoup(f, "html.parser")
+                soup = parse_html(f, preserve_markup=True)
         except Exception as e:
             logger.warning(f"Failed to parse {html_path}: {e}")
             return
 
         modified = False
 
-        # Rewrite <a href="...">
-        for tag in soup.find_all("a", href=True):
-            if self._rewrite_link(tag, "href"):
-                modified = True
-
-        # Rewrite <link href="..."> (stylesheets)
-        for tag in soup.find_all("link", href=True):
-            if self._rewrite_link(tag, "href"):
-                modified = True
-
-        # Rewrite <script src="...">
-        for tag in soup.find_all("script", src=True):
-            if self._rewrite_link(tag, "src"):
-                modified = True
-
-        # Rewrite <img src="...">
-        for tag in soup.find_all("img", src=True):
-            if self._rewrite_link(tag, "src"):
-                modified = True
-
-        # Rewrite <source src="..."> (audio/video)
-        for tag in soup.find_all("source", src=True):
-            if self._rewrite_link(tag, "src"):
-                modified = True
+        # Rewrite href/src/srcset/poster/data-* link attributes
+        for tag in soup.find_all(True):
+            for attr in list(tag.attrs):
+                if self._is_link_attribute(tag.name, attr) and self._rewrite_link(tag, attr):
+                    modified = True
 
         # Rewrite CSS url() references
         for tag in soup.find_all("style"):
@@ -171,30 +605,72 @@ class MirrorPostprocessor:
 
         # Save if modified
         if modified:
-            with html_path.open("w", encoding="utf-8") as f:
-                f.write(str(soup))
+            write_replacing(html_path, str(soup))
             logger.debug(f"Rewrote links in {html_path.name}")
 
     def _rewrite_link(self, tag, attr: str) -> bool:
         """Rewrite a single link attribute to root-relative."""
-        original = tag[attr]
+        new_value = self._rewrite_attribute(attr, tag[attr])
+        if new_value is None:
+            return False
+        tag[attr] = new_value
+        return True
 
+    def _is_link_attribute(self, tag: str, attr: str) -> bool:
+        """Return True if tag's attr may hold a link into the mirror."""
+        return attr in LINK_ATTRIBUTES.get(tag, ()) or attr.startswith("data-")
+
+    def _rewrite_attribute(self, attr: str, value: str) -> str | None:
+        """New value for a link attribute, or None to leave it alone."""
+        if attr in SRCSET_ATTRIBUTES:
+            return self._rewrite_srcset(value)
+        if attr.startswith("data-") and not FILE_PATH_PATTERN.fullmatch(value):
+            return None  # not a link
+        return self._rewrite_url(value)
+
+    def _rewrite_srcset(self, srcset: str) -> str | None:
+        """Rewrite each candidate URL of a srcset, keeping width/density descriptors."""
+        if "data:" in srcset:
+            # Commas inside data: URLs make the candidate list ambiguous
+            self.link_counts["as-is"] += 1
+            return None
+
+        candidates = []
+        changed = False
+        for candidate in srcset.split(","):
+            parts = candidate.split(None, 1)
+            if not parts:
+                continue
+            new_url = self._rewrite_url(parts[0])
+            if new_url is not None and new_url != parts[0]:
+                parts[0] = new_url
+                changed = True
+            candidates.append(" ".join(parts))
+        return ", ".join(candidates) if changed else None
+
+    def _rewrite_url(self, original: str) -> str | None:
+        """Root-relative form of a link, or None for links that are left alone."""
         # Skip external URLs and anchors
         if original.startswith(("http://", "https://", "//", "#", "mailto:", "tel:")):
-            return False
+            self.link_counts["as-is"] += 1
+            return None
 
         # Parse and normalize
         parsed = urlparse(original)
         if parsed.scheme or parsed.netloc:
-            return False
+            self.link_counts["as-is"] += 1
+            return None
 
         # Extract path component
         path = parsed.path
 
-        # Try to map to new location
-        new_path = self._resolve_new_path(path)
+        # Try to map to new location; links to files outside the mirror stay as written
+        new_path = self._resolve(path)
         if new_path is None:
-            return False
+            self.link_counts["dangling"] += 1
+            logger.debug(f"Dangling link: {original}")
+            return None
+        self.link_counts["resolved"] += 1
 
         # Make root-relative
         root_relative = f"/{new_path}"
@@ -205,42 +681,79 @@ class MirrorPostprocessor:
         if parsed.fragment:
             root_relative += f"#{parsed.fragment}"
 
-        tag[attr] = root_relative
-        return True
+        return root_relative
 
-    def _resolve_new_path(self, original_path: str) -> str | None:
-        """Find new staging path for an original path."""
+    def _resolve(self, original_path: str) -> str | None:
+        """Find the new staging path for an original path; None if it is not mirrored."""
         # Normalize path
         original_path = original_path.lstrip("/")
 
-        # Direct lookup in asset map
-        if original_path in self.asset_map:
-            return self.asset_map[original_path]
+        if original_path in self._resolved:
+            return self._resolved[original_path]
 
-        # Try matching by filename
-        filename = Path(original_path).name
-        for old_path, new_path in self.asset_map.items():
-            if Path(old_path).name == filename:
-                return new_path
+        # Direct lookup in asset map, then by filename
+        new_path = self.asset_map.get(original_path)
+        if new_path is None:
+            new_path = self.name_index.get(Path(original_path).name)
 
-        # Fallback: return as-is
-        return original_path
+        self._resolved[original_path] = new_path
+        return new_path
 
     def _rewrite_css_urls(self, css_content: str) -> str:
         """Rewrite url() references in CSS."""
-        import re
 
         def replace_url(match):
-            url = match.group(1).strip('\'"')
-            if url.startswith(("http://", "https://", "//", "#", "data:")):
+            root_relative = self._rewrite_url(match.group(1).strip('\'"'))
+            if root_relative is None:
                 return match.group(0)
+            return f'url("{root_relative}")'
+
+        return CSS_URL_PATTERN.sub(replace_url, css_content)
 
-            new_path = self._resolve_new_path(url)
-            if new_path:
-                return f'url("/{new_path}")'
-            return match.group(0)
 
-        return re.sub(r'url\(["\']?([^"\')]+)["\']?\)', replace_url, css_content)
+class _RecordCollector(logging.Handler):
+    """Buffer log records in a worker so the parent can replay them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        record.msg = record.getMessage()
+        record.args = None
+        self.records.append(record)
+
+
+_worker_processor: MirrorPostprocessor | None = None
+
+
+def _init_worker(
+    raw_dir: Path,
+    staging_dir: Path,
+    rewrite_mode: str,
+    asset_map: dict[str, str],
+    name_index: dict[str, str],
+    log_level: int,
+) -> None:
+    """Process pool initializer: build this worker's read-only resolver."""
+    global _worker_processor
+    _worker_processor = MirrorPostprocessor(raw_dir, staging_dir, rewrite_mode=rewrite_mode)
+    _worker_processor.asset_map = asset_map
+    _worker_processor.name_index = name_index
+    logger.setLevel(log_level)
+    logger.propagate = False
+
+
+def _process_in_worker(path: Path) -> tuple[list[logging.LogRecord], Counter[str]]:
+    """Rewrite one file in a worker and return its log records and link counts."""
+    collector = _RecordCollector()
+    logger.addHandler(collector)
+    _worker_processor.link_counts = Counter()
+    try:
+        _worker_processor._process_file(path)
+    finally:
+        logger.removeHandler(collector)
+    return collector.records, _worker_processor.link_counts
 
 
 def main() -> int:
@@ -252,17 +765,56 @@ def main() -> int:
     )
     parser.add_argument("raw_dir", type=Path, help="Raw wget output directory")
     parser.add_argument("staging_dir", type=Path, help="Staging output directory")
+    parser.add_argument(
+        "--previous",
+        type=Path,
+        default=None,
+        help="Staging tree of an earlier run; unchanged files are hardlinked from it",
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default=None,
+        help="How files are staged from raw_dir (default: reflink, else hardlink, else copy)",
+    )
+    parser.add_argument(
+        "--rewrite",
+        choices=REWRITE_MODES,
+        default="splice",
+        help="splice changed link values into the original bytes, or re-serialize a parsed tree (default: splice)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Rewrite HTML files in N worker processes (default: 1)"
+    )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose logging"
     )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Write per-phase timings and counters to PATH at exit",
+    )
+
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
+    write_metrics_at_exit(args.metrics_json, "postprocess_mirror")
+    start_profile(args, "postprocess_mirror")
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
     try:
-        processor = MirrorPostprocessor(args.raw_dir, args.staging_dir)
+        processor = MirrorPostprocessor(
+            args.raw_dir,
+            args.staging_dir,
+            jobs=args.jobs,
+            previous_dir=args.previous,
+            link_mode=args.link_mode,
+            rewrite_mode=args.rewrite,
+        )
         processor.run()
         return 0
     except Exception as e:
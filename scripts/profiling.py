@@ -0,0 +1,143 @@
+"""
+Opt-in profiling for the migration scripts' entry points.
+
+Every script's main() accepts ``--profile {cprofile,tracemalloc}``; the
+profile covers the rest of the run and is written when the interpreter
+exits (including on ``sys.exit(1)``) to ``--profile-dir`` as
+``<script>-<timestamp>.*``:
+
+- cprofile: ``.prof`` (load with ``python -m pstats`` or snakeviz) and a
+  ``.txt`` summary of the top ``--profile-top`` functions by cumulative and
+  by own time. Only the main thread is profiled; pass ``-j 1`` (or a single
+  worker) to see work that otherwise runs in pools.
+- tracemalloc: ``.tracemalloc`` holding the snapshot taken closest to peak
+  memory (``tracemalloc.Snapshot.load`` reads it back) and a ``.txt``
+  summary with the peak, the phase that ended nearest it, and the top
+  allocation sites. Snapshots are taken at metrics.py phase boundaries
+  whenever traced memory has grown well past the last one.
+
+Requirements: Python 3.12+
+"""
+
+import argparse
+import atexit
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from metrics import get_metrics
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+DEFAULT_PROFILE_DIR = Path("tmp/profiles")
+DEFAULT_TOP = 25
+TRACEMALLOC_FRAMES = 16
+SNAPSHOT_GROWTH = 1.1  # retake the peak snapshot once memory grows 10% past it
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile, --profile-dir and --profile-top to a script's parser."""
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Profile the run with cProfile or tracemalloc and write a report at exit",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=DEFAULT_PROFILE_DIR,
+        metavar="DIR",
+        help=f"Where profiles are written (default: {DEFAULT_PROFILE_DIR})",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP,
+        metavar="N",
+        help=f"Entries in the hotspot summary (default: {DEFAULT_TOP})",
+    )
+
+
+class PeakSnapshots:
+    """Keeps the tracemalloc snapshot taken at the highest traced memory seen."""
+
+    def __init__(self) -> None:
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.phase: Optional[str] = None
+        self.traced = 0
+        self._lock = threading.Lock()
+
+    def check(self, phase: str) -> None:
+        """Phase listener: snapshot if memory grew well past the kept snapshot."""
+        current, _ = tracemalloc.get_traced_memory()
+        if current <= self.traced * SNAPSHOT_GROWTH:
+            return
+        with self._lock:
+            if current <= self.traced * SNAPSHOT_GROWTH:
+                return
+            self.snapshot = tracemalloc.take_snapshot()
+            self.phase = phase
+            self.traced = current
+
+
+def start_profile(args: argparse.Namespace, script: str) -> None:
+    """Start the profiler chosen by ``args.profile`` (if any); it reports at exit."""
+    if args.profile is None:
+        return
+    stem = args.profile_dir / f"{script}-{datetime.now():%Y%m%d-%H%M%S}"
+    if args.profile == "cprofile":
+        profiler = cProfile.Profile()
+        atexit.register(_write_cprofile, profiler, stem, args.profile_top)
+        profiler.enable()
+    else:
+        peaks = PeakSnapshots()
+        get_metrics().add_phase_listener(peaks.check)
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        atexit.register(_write_tracemalloc, peaks, stem, args.profile_top)
+
+
+def _write_cprofile(profiler: cProfile.Profile, stem: Path, top: int) -> None:
+    profiler.disable()
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(stem.with_suffix(".prof"))
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary).strip_dirs()
+    for key in ("cumulative", "tottime"):
+        summary.write(f"Top {top} by {key}\n")
+        stats.sort_stats(key).print_stats(top)
+    stem.with_suffix(".txt").write_text(summary.getvalue(), encoding="utf-8")
+    print(f"\nProfile written to {stem.with_suffix('.prof')} (summary: {stem.with_suffix('.txt')})")
+
+
+def _write_tracemalloc(peaks: PeakSnapshots, stem: Path, top: int) -> None:
+    peaks.check("exit")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    peaks.snapshot.dump(str(stem.with_suffix(".tracemalloc")))
+
+    snapshot = peaks.snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    lines = [
+        f"Peak traced memory: {peak / 1e6:.1f} MB",
+        f"Snapshot: {peaks.traced / 1e6:.1f} MB traced, taken after phase '{peaks.phase}'",
+        "",
+        f"Top {top} allocation sites in the snapshot",
+    ]
+    for stat in snapshot.statistics("lineno")[:top]:
+        lines.append(f"  {stat.size / 1e3:10.1f} KB  {stat.count:8d} blocks  {stat.traceback[0]}")
+    largest = snapshot.statistics("traceback")[:1]
+    if largest:
+        lines += ["", f"Traceback of the largest site ({largest[0].size / 1e3:.1f} KB)"]
+        lines += [f"  {line}" for line in largest[0].traceback.format()]
+    stem.with_suffix(".txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"\nPeak traced memory {peak / 1e6:.1f} MB; snapshot written to "
+          f"{stem.with_suffix('.tracemalloc')} (summary: {stem.with_suffix('.txt')})")
@@ -12,35 +12,127 @@ Categories:
 - general/: Hero images, logos, misc from home/, contact/, links/, publications/
 """
 
+import argparse
+import hashlib
 import json
 import shutil
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+from profiling import add_profile_arguments, start_profile
+
+BASE_DIR = Path('assets/img')
+SNIFF_BYTES = 512
+SCAN_CACHE_NAME = '.scan-cache.json'
+
+# Detected type -> extension for files we accept as images
+IMAGE_EXTENSIONS = {
+    'jpeg': '.jpg',
+    'png': '.png',
+    'gif': '.gif',
+    'webp': '.webp',
+    'avif': '.avif',
+    'svg': '.svg',
+    'tiff': '.tif',
+    'bmp': '.bmp',
+    'ico': '.ico',
+    'heic': '.heic',
+    'jp2': '.jp2',
+}
+
+
+def sniff_file_type(header: bytes) -> str | None:
+    """Identify a file from its first few hundred bytes.
+
+    Returns one of the IMAGE_EXTENSIONS keys, 'html' for error pages saved in
+    place of an image, or None when the format is unknown.
+    """
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if header[:2] == b'BM':
+        return 'bmp'
+    if header[:4] == b'\x00\x00\x01\x00':
+        return 'ico'
+    if header[:12] == b'\x00\x00\x00\x0cjP  \r\n\x87\n' or header[:4] == b'\xff\x4f\xff\x51':
+        return 'jp2'
+    if header[4:8] == b'ftyp':
+        box_size = int.from_bytes(header[:4], 'big')
+        brands = header[8:min(box_size, len(header))]
+        brands = {brands[i:i + 4] for i in range(0, len(brands) - 3, 4)}
+        if brands & {b'avif', b'avis'}:
+            return 'avif'
+        if brands & {b'heic', b'heix', b'mif1', b'msf1'}:
+            return 'heic'
+
+    text = header.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if b'<svg' in text and text.startswith((b'<?xml', b'<svg', b'<!--', b'<!doctype svg')):
+        return 'svg'
+    if text.startswith((b'<!doctype html', b'<html', b'<head', b'<body', b'<!--')):
+        return 'html'
+    return None
+
+
+def get_file_type(filepath: str) -> str | None:
+    """Sniff the actual file type from the file header."""
+    with open(filepath, 'rb') as f:
+        return sniff_file_type(f.read(SNIFF_BYTES))
+
+
+def is_valid_image(file_type: str | None) -> bool:
+    """Check if a sniffed type is a real image (not an HTML error page)."""
+    return file_type in IMAGE_EXTENSIONS
+
+
+def get_proper_extension(filepath: str, file_type: str | None) -> str:
+    """Determine the correct file extension based on actual file type."""
+    if file_type in IMAGE_EXTENSIONS:
+        return IMAGE_EXTENSIONS[file_type]
+    return Path(filepath).suffix.lower() or '.jpg'
 
-def get_file_type(filepath: str) -> str:
-    """Use the 'file' command to determine actual file type."""
-    result = subprocess.run(['file', filepath], capture_output=True, text=True)
-    return result.stdout
 
+def file_blake2b(path: Path) -> str:
+    """Stream a file through BLAKE2b to get its content address."""
+    with path.open('rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=32)).hexdigest()
 
-def is_valid_image(filepath: str) -> bool:
-    """Check if a file is a valid image (not HTML error page)."""
-    file_type = get_file_type(filepath)
-    return any(img_type in file_type for img_type in ['JPEG', 'PNG', 'GIF', 'image data'])
 
+def scan_files(paths: list[Path], cache_path: Path) -> dict[Path, dict]:
+    """Sniff and hash many files on a thread pool.
 
-def get_proper_extension(filepath: str) -> str:
-    """Determine the correct file extension based on actual file type."""
-    file_type = get_file_type(filepath)
-    if 'PNG' in file_type:
-        return '.png'
-    elif 'JPEG' in file_type:
-        return '.jpg'
-    elif 'GIF' in file_type:
-        return '.gif'
-    return Path(filepath).suffix.lower() or '.jpg'
+    Each result holds the sniffed 'type' and 'blake2b' content hash. Results
+    are cached by (path, size, mtime) so unchanged files are not re-read.
+    """
+    try:
+        cache = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        cache = {}
+
+    def scan(path: Path) -> tuple[str, dict]:
+        stat = path.stat()
+        entry = cache.get(str(path))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return str(path), entry
+        return str(path), {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'type': get_file_type(str(path)),
+            'blake2b': file_blake2b(path),
+        }
+
+    with ThreadPoolExecutor() as pool:
+        fresh = dict(pool.map(scan, paths))
+
+    cache_path.write_text(json.dumps(fresh, indent=2, sort_keys=True))
+    return {path: fresh[str(path)] for path in paths}
 
 
 def categorize_by_source_folder(source_folder: str) -> str:
@@ -64,8 +156,7 @@ def is_hero_image(filename: str) -> bool:
     return hero_hash in filename
 
 
-def main():
-    base_dir = Path('/Users/b80985/Documents/GitHub/imewei.github.io/assets/img')
+def main(base_dir: Path = BASE_DIR):
     imported_dir = base_dir / 'imported'
 
     # Target directories
@@ -82,7 +173,8 @@ def main():
             shutil.rmtree(target_dir)
         target_dir.mkdir(exist_ok=True)
 
-    hero_copied = False
+    hero_entry = None
+    entries_by_hash = {}  # content hash -> manifest entry of the one stored copy
 
     # Manifest data
     manifest = {
@@ -104,6 +196,16 @@ def main():
     # Process each source folder
     source_folders = ['our-team', 'wei-chen', 'research', 'facilities', 'home', 'contact', 'links', 'publications']
 
+    # Sniff and hash every candidate file up front, in parallel and cached across runs
+    candidates = [
+        file_path
+        for source_folder in source_folders
+        if (imported_dir / source_folder).exists()
+        for file_path in (imported_dir / source_folder).iterdir()
+        if file_path.is_file() and not file_path.name.startswith('.')
+    ]
+    scans = scan_files(candidates, imported_dir / SCAN_CACHE_NAME)
+
     for source_folder in source_folders:
         source_path = imported_dir / source_folder
         if not source_path.exists():
@@ -113,25 +215,42 @@ def main():
         base_category = categorize_by_source_folder(source_folder)
 
         for file_path in sorted(source_path.iterdir()):
-            if file_path.name.startswith('.'):
+            if not file_path.is_file() or file_path.name.startswith('.'):
                 continue
 
             original_name = file_path.stem
+            file_type = scans[file_path]['type']
+            content_hash = scans[file_path]['blake2b']
+            reference = {
+                'original_path': str(file_path.relative_to(base_dir)),
+                'source_page': source_folder,
+            }
 
             # Check if valid image
-            if not is_valid_image(str(file_path)):
+            if not is_valid_image(file_type):
+                if file_type != 'html':
+                    print(f"Skipping {file_path}: unrecognized file format")
                 manifest['invalid_files'].append({
                     'original_path': str(file_path.relative_to(base_dir)),
                     'source_page': source_folder,
-                    'reason': 'HTML error page (not an actual image)',
+                    'reason': (
+                        'HTML error page (not an actual image)'
+                        if file_type == 'html'
+                        else 'Unrecognized file format'
+                    ),
                 })
                 continue
 
+            # Identical content already stored: just record the reference
+            if content_hash in entries_by_hash:
+                entries_by_hash[content_hash]['references'].append(reference)
+                continue
+
             # Determine category and target directory for THIS image
             if is_hero_image(original_name):
-                if hero_copied:
-                    continue  # Skip duplicate hero images
-                hero_copied = True
+                if hero_entry is not None:
+                    hero_entry['references'].append(reference)  # Other size of the banner
+                    continue
                 category = 'general'
                 new_name = 'hero-banner'
             else:
@@ -153,25 +272,22 @@ def main():
             target_dir = target_dirs[category]
 
             # Get proper extension
-            extension = get_proper_extension(str(file_path))
+            extension = get_proper_extension(str(file_path), file_type)
             new_filename = f"{new_name}{extension}"
             target_path = target_dir / new_filename
 
-            # Handle name conflicts
-            if target_path.exists():
-                if file_path.stat().st_size == target_path.stat().st_size:
-                    continue  # Same file, skip
-                counter = 2
-                while target_path.exists():
-                    new_filename = f"{new_name}-{counter}{extension}"
-                    target_path = target_dir / new_filename
-                    counter += 1
+            # Handle name conflicts (same name, different content)
+            counter = 2
+            while target_path.exists():
+                new_filename = f"{new_name}-{counter}{extension}"
+                target_path = target_dir / new_filename
+                counter += 1
 
             # Copy file to new location
             shutil.copy2(str(file_path), str(target_path))
 
             # Record in manifest
-            manifest['images'].append({
+            entry = {
                 'original_path': str(file_path.relative_to(base_dir)),
                 'new_path': str(target_path.relative_to(base_dir)),
                 'category': category,
@@ -179,11 +295,18 @@ def main():
                 'original_filename': file_path.name,
                 'new_filename': new_filename,
                 'file_size': target_path.stat().st_size,
-            })
+                'content_hash': f"blake2b:{content_hash}",
+                'references': [reference],
+            }
+            manifest['images'].append(entry)
+            entries_by_hash[content_hash] = entry
+            if new_name == 'hero-banner':
+                hero_entry = entry
 
     # Add summary statistics
     manifest['summary'] = {
         'total_images': len(manifest['images']),
+        'total_references': sum(len(img['references']) for img in manifest['images']),
         'invalid_files': len(manifest['invalid_files']),
         'by_category': {
             cat: len([img for img in manifest['images'] if img['category'] == cat])
@@ -198,6 +321,7 @@ def main():
 
     print("Image reorganization complete!")
     print(f"Total images copied: {manifest['summary']['total_images']}")
+    print(f"Page references: {manifest['summary']['total_references']}")
     print(f"Invalid files skipped: {manifest['summary']['invalid_files']}")
     print(f"By category: {manifest['summary']['by_category']}")
     print(f"Manifest saved to: {manifest_path}")
@@ -206,4 +330,10 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Reorganize imported images and write image-manifest.json')
+    add_profile_arguments(parser)
+    parser.add_argument('--base-dir', type=Path, default=BASE_DIR,
+                        help=f'Image root holding imported/ (default: {BASE_DIR})')
+    args = parser.parse_args()
+    start_profile(args, 'reorganize_images')
+    main(args.base_dir)
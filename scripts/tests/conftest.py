@@ -0,0 +1,6 @@
+"""Make the scripts importable the way they import each other (by module name)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import build_responsive_images
+
+
+def srcset_widths(srcset):
+    return [candidate.rsplit(" ", 1)[1] for candidate in srcset.split(", ")]
+
+
+def test_source_wider_than_largest_bucket_has_unique_widths(tmp_path):
+    source = tmp_path / "wide.jpg"
+    Image.new("RGB", (3000, 300), "gray").save(source)
+
+    record = build_responsive_images.encode_derivatives(source, tmp_path / "out", ["webp"])
+
+    srcsets = [source["srcset"] for source in record["sources"]] + [record["fallback_srcset"]]
+    for srcset in srcsets:
+        widths = srcset_widths(srcset)
+        assert len(widths) == len(set(widths))
+        assert widths[-1] == f"{build_responsive_images.WIDTHS[-1]}w"
+    assert record["width"] == build_responsive_images.WIDTHS[-1]
+    assert record["height"] == 192
+
+
+def test_duplicate_sources_share_one_encode_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for category in ("team", "general"):
+        (tmp_path / "assets" / "img" / category).mkdir(parents=True)
+        Image.new("RGB", (400, 200), "gray").save(tmp_path / "assets" / "img" / category / "same.png")
+    encoded = []
+    encode = build_responsive_images.encode_derivatives
+
+    def counting_encode(source, out_dir, formats):
+        encoded.append(out_dir)
+        return encode(source, out_dir, formats)
+
+    monkeypatch.setattr(build_responsive_images, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(build_responsive_images, "encode_derivatives", counting_encode)
+
+    records = build_responsive_images.build(jobs=2)
+
+    assert len(encoded) == 1
+    assert records["/assets/img/general/same.png"] == records["/assets/img/team/same.png"]
+    assert [entry.name for entry in (tmp_path / "assets/img/responsive").iterdir()] == [encoded[0].name]
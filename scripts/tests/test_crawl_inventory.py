@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+import crawl_inventory
+from fixture_site import serve_fixture_site
+
+PAGE_COUNT = 40
+
+
+def crawl(start_url, output_dir, concurrency, monkeypatch):
+    argv = ["crawl_inventory.py", "--start-url", start_url, "--output-dir", str(output_dir), "--rate", "0"]
+    monkeypatch.setattr("sys.argv", argv + ["--concurrency", str(concurrency)])
+    crawl_inventory.main()
+    return {name: (output_dir / name).read_text(encoding="utf-8") for name in ("site-map.json", "inventory.md")}
+
+
+@pytest.mark.parametrize("concurrency", [4, 16])
+def test_parallel_crawl_matches_serial_inventory(tmp_path, monkeypatch, concurrency):
+    # Per-request latency lets parallel fetches complete out of order
+    with serve_fixture_site(PAGE_COUNT, latency=0.01) as start_url:
+        serial = crawl(start_url, tmp_path / "serial", 1, monkeypatch)
+        parallel = crawl(start_url, tmp_path / "parallel", concurrency, monkeypatch)
+
+    assert parallel == serial
+    urls = [page["url"] for page in json.loads(serial["site-map.json"])["pages"]]
+    assert len(urls) == PAGE_COUNT + 1  # the site root and page-0 serve the same page
@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from downloads import download_file, partial_path
+
+BODY = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 16
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves BODY, answering ranges past its end with 416 like Google's CDN."""
+
+    requests_seen: list[str | None] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        requested = self.headers.get("Range")
+        self.requests_seen.append(requested)
+        start = int(requested.removeprefix("bytes=").rstrip("-")) if requested else 0
+        if start >= len(BODY):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(BODY)}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206 if requested else 200)
+        if requested:
+            self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+        self.send_header("Content-Length", str(len(BODY) - start))
+        self.end_headers()
+        self.wfile.write(BODY[start:])
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+@contextmanager
+def serve_body():
+    RangeHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/image"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(
+    "part_body, expected_requests",
+    [
+        (BODY, [f"bytes={len(BODY)}-"]),  # complete .part is finalized as is
+        (BODY + b"stale", [f"bytes={len(BODY) + 5}-", None]),  # oversized .part is fetched again
+    ],
+    ids=["complete-part", "oversized-part"],
+)
+def test_416_on_resume_finishes_in_one_call(tmp_path, part_body, expected_requests):
+    dest = tmp_path / "image.png"
+    partial_path(dest).write_bytes(part_body)
+
+    with serve_body() as url:
+        size = download_file(url, dest)
+
+    assert size == len(BODY)
+    assert dest.read_bytes() == BODY
+    assert not partial_path(dest).exists()
+    assert RangeHandler.requests_seen == expected_requests
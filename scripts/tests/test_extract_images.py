@@ -0,0 +1,210 @@
+import io
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+import extract_images
+from cache_index import CacheIndex, cache_filename, content_sha256
+from fetch_engine import FetchEngine
+from fixture_site import fixture_image, render_page, serve_handler
+
+SITE_URL = "https://sites.google.com/view/msdsoftmatter"
+PAGE_COUNT = 3
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Point the script's cache, asset and report directories into tmp_path."""
+    monkeypatch.setattr(extract_images, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(extract_images, "ASSETS_DIR", tmp_path / "assets")
+    monkeypatch.setattr(extract_images, "REPORT_DIR", tmp_path / "report")
+    return tmp_path
+
+
+def write_fixture_cache(cache_dir):
+    """Lay out the synthetic fixture pages as an indexed cache."""
+    index = CacheIndex(cache_dir)
+    for page in range(PAGE_COUNT):
+        url = f"{SITE_URL}/page-{page}"
+        html = render_page(page, PAGE_COUNT)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        (cache_dir / cache_filename(url)).write_text(html, encoding="utf-8")
+        index.record(url, fetched_at=time.time(), etag=None, last_modified=None, content_sha256=content_sha256(html))
+
+
+def test_main_reports_current_images_without_downloading(workdir, monkeypatch):
+    write_fixture_cache(extract_images.CACHE_DIR)
+    images = extract_images.scan_cache_for_images(jobs=1)
+
+    # Every image already has a local copy as large as its best variant
+    choices = {}
+    for normalized_url, refs in images.items():
+        body = fixture_image(refs[0]["filename"])
+        page_dir = extract_images.ASSETS_DIR / refs[0]["page"]
+        page_dir.mkdir(parents=True, exist_ok=True)
+        (page_dir / f"{refs[0]['filename']}=w1280").write_bytes(body)
+        choices[normalized_url] = {"url": f"{normalized_url}=s0", "suffix": "=s0", "size": len(body), "probed_at": time.time()}
+    (extract_images.CACHE_DIR / extract_images.VARIANT_CACHE_NAME).write_text(json.dumps(choices), encoding="utf-8")
+
+    monkeypatch.setattr("sys.argv", ["extract_images.py", "--jobs", "1", "--rate", "0"])
+    extract_images.main()
+
+    report = json.loads((extract_images.REPORT_DIR / "image-extraction-report.json").read_text(encoding="utf-8"))
+    assert report["summary"]["total_unique_images_in_cache"] == len(images)
+    assert report["summary"]["images_already_best"] == len(images)
+    assert report["summary"]["images_still_missing"] == 0
+    assert {result["status"] for result in report["download_results"]} == {"current"}
+    assert (extract_images.REPORT_DIR / "image-extraction-report.md").exists()
+
+
+def test_unindexed_legacy_pages_are_indexed_with_old_slugs(workdir):
+    cache_dir = extract_images.CACHE_DIR
+    cache_dir.mkdir()
+    for url, page in [(SITE_URL, 0), (f"{SITE_URL}/home", 1)]:
+        (cache_dir / cache_filename(url)).write_text(render_page(page, PAGE_COUNT), encoding="utf-8")
+
+    images = extract_images.scan_cache_for_images(jobs=1)
+
+    assert {ref["page"] for refs in images.values() for ref in refs} == {"base", "home"}
+    assert CacheIndex(cache_dir).lookup(SITE_URL)["slug"] == "base"
+
+
+def test_no_indexed_pages_exits_without_overwriting_report(workdir, monkeypatch):
+    cache_dir = extract_images.CACHE_DIR
+    cache_dir.mkdir()
+    (cache_dir / cache_filename(f"{SITE_URL}/unknown")).write_text(render_page(0, PAGE_COUNT), encoding="utf-8")
+    report_path = extract_images.REPORT_DIR / "image-extraction-report.json"
+    report_path.parent.mkdir()
+    report_path.write_text('{"previous": true}', encoding="utf-8")
+
+    monkeypatch.setattr("sys.argv", ["extract_images.py", "--jobs", "1", "--rate", "0"])
+    with pytest.raises(SystemExit) as exit_info:
+        extract_images.main()
+
+    assert exit_info.value.code == 1
+    assert report_path.read_text(encoding="utf-8") == '{"previous": true}'
+
+
+def test_scan_entries_without_content_hash_are_rescanned(workdir):
+    cache_dir = extract_images.CACHE_DIR
+    url = f"{SITE_URL}/page-0"
+    cache_dir.mkdir()
+    (cache_dir / cache_filename(url)).write_text(render_page(0, PAGE_COUNT), encoding="utf-8")
+    CacheIndex(cache_dir).record(url, fetched_at=time.time(), etag=None, last_modified=None)
+
+    first = extract_images.scan_cache_for_images(jobs=1)
+    second = extract_images.scan_cache_for_images(jobs=1)
+
+    assert first and first == second
+
+
+def png(width, height, padding=0):
+    """A decodable PNG of the given size, optionally bloated with a text chunk."""
+    info = PngInfo()
+    if padding:
+        info.add_text("padding", "x" * padding)
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "gray").save(buffer, "PNG", pnginfo=info)
+    return buffer.getvalue()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    bodies: dict[str, bytes] = {}
+    hits: list[str] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.hits.append(self.path)
+        body = self.bodies[self.path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def image_server():
+    ImageHandler.bodies = {}
+    ImageHandler.hits = []
+    with serve_handler(ImageHandler) as site_url:
+        yield site_url
+
+
+def image_entry(normalized_url, *original_urls):
+    return {
+        "normalized_url": normalized_url,
+        "filename": "IMG",
+        "pages": ["research"],
+        "original_urls": list(original_urls),
+    }
+
+
+def test_upgrade_replaces_the_superseded_copy_in_place(workdir, image_server):
+    ImageHandler.bodies["/view/msdsoftmatter/IMG=s0"] = png(40, 40)
+    local = extract_images.ASSETS_DIR / "research" / "IMG=w1280"
+    local.parent.mkdir(parents=True)
+    local.write_bytes(png(10, 10))
+    img = image_entry(f"{image_server}IMG")
+    choice = {"url": f"{image_server}IMG=s0", "suffix": "=s0", "size": 10**6, "probed_at": time.time()}
+
+    result = extract_images.download_best_image(img, choice, [local], FetchEngine(rate=0))
+
+    assert result["status"] == "upgraded"
+    assert result["path"] == str(local)
+    assert [path.name for path in local.parent.iterdir()] == ["IMG=w1280"]
+    assert Image.open(local).size == (40, 40)
+    assert choice["pixels"] == 1600
+
+
+def test_larger_file_with_no_more_pixels_is_not_an_upgrade(workdir, image_server):
+    ImageHandler.bodies["/view/msdsoftmatter/IMG=s0"] = png(10, 10, padding=4096)
+    local = extract_images.ASSETS_DIR / "research" / "IMG=w1280"
+    local.parent.mkdir(parents=True)
+    local.write_bytes(png(10, 10))
+    img = image_entry(f"{image_server}IMG")
+    choice = {"url": f"{image_server}IMG=s0", "suffix": "=s0", "size": 4096, "probed_at": time.time()}
+
+    first = extract_images.download_best_image(img, choice, [local], FetchEngine(rate=0))
+    second = extract_images.download_best_image(img, choice, [local], FetchEngine(rate=0))
+
+    assert (first["status"], second["status"]) == ("current", "current")
+    assert local.read_bytes() == png(10, 10)
+    assert [path.name for path in local.parent.iterdir()] == ["IMG=w1280"]
+    assert len(ImageHandler.hits) == 1  # the recorded pixel count answers the second run
+
+
+def test_images_linked_at_original_size_are_not_probed(monkeypatch):
+    monkeypatch.setattr(extract_images, "probe_size", lambda url, engine: pytest.fail(f"probed {url}"))
+    img = image_entry("https://lh3.googleusercontent.com/sitesv/IMG", "https://lh3.googleusercontent.com/sitesv/IMG=s0")
+
+    choice = extract_images.choose_variant(img, FetchEngine(rate=0))
+
+    assert choice["url"] == "https://lh3.googleusercontent.com/sitesv/IMG=s0"
+    assert extract_images.is_current(choice, []) is False
+
+
+def test_variant_choices_expire(workdir, monkeypatch):
+    fresh, stale = image_entry("https://lh3.example/FRESH"), image_entry("https://lh3.example/STALE")
+    cached = {"size": 1, "suffix": "=s0"}
+    extract_images.save_variant_cache({
+        fresh["normalized_url"]: {**cached, "url": "fresh", "probed_at": time.time()},
+        stale["normalized_url"]: {**cached, "url": "stale", "probed_at": time.time() - extract_images.VARIANT_TTL - 1},
+    })
+    probed = []
+
+    def fake_choose(img, engine):
+        probed.append(img["normalized_url"])
+        return {**cached, "url": "reprobed", "probed_at": time.time()}
+
+    monkeypatch.setattr(extract_images, "choose_variant", fake_choose)
+    choices = extract_images.choose_variants([fresh, stale], FetchEngine(rate=0), workers=1)
+
+    assert probed == [stale["normalized_url"]]
+    assert choices[fresh["normalized_url"]]["url"] == "fresh"
+    assert choices[stale["normalized_url"]]["url"] == "reprobed"
@@ -0,0 +1,138 @@
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+from types import SimpleNamespace
+
+import pytest
+
+import fetch_engine
+from fetch_engine import FetchEngine, HostRateLimiter
+from fixture_site import serve_fixture_site, serve_handler
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each path with its queued (status, headers) responses, then 200."""
+
+    script: dict[str, list[tuple[int, dict[str, str]]]] = {}
+    hits: dict[str, int] = {}
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        queued = self.script.get(self.path, [])
+        status, headers = queued.pop(0) if queued else (200, {})
+        body = f"{status} {self.path}".encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def scripted_site():
+    ScriptedHandler.script = {}
+    ScriptedHandler.hits = {}
+    with serve_handler(ScriptedHandler) as site_url:
+        yield site_url
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the engine's sleeps instead of waiting; backoff jitter takes its upper bound."""
+    recorded = []
+    clock = SimpleNamespace(sleep=recorded.append, monotonic=time.monotonic, time=time.time)
+    monkeypatch.setattr(fetch_engine, "time", clock)
+    monkeypatch.setattr(fetch_engine.random, "uniform", lambda low, high: high)
+    return recorded
+
+
+def test_transient_errors_are_retried_with_exponential_backoff(scripted_site, sleeps):
+    ScriptedHandler.script["/view/msdsoftmatter/flaky"] = [(503, {}), (502, {})]
+    engine = FetchEngine(rate=0, retries=3, backoff=0.5)
+
+    response = engine.get(f"{scripted_site}flaky")
+
+    assert response.status_code == 200
+    assert ScriptedHandler.hits["/view/msdsoftmatter/flaky"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_exhausted_retries_return_the_last_response(scripted_site, sleeps):
+    ScriptedHandler.script["/view/msdsoftmatter/down"] = [(500, {})] * 5
+    engine = FetchEngine(rate=0, retries=2, backoff=0.5)
+
+    assert engine.get(f"{scripted_site}down").status_code == 500
+    assert ScriptedHandler.hits["/view/msdsoftmatter/down"] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retry_after_seconds_overrides_backoff(scripted_site, sleeps):
+    ScriptedHandler.script["/view/msdsoftmatter/busy"] = [(429, {"Retry-After": "7"})]
+    engine = FetchEngine(rate=0, backoff=0.5)
+
+    assert engine.get(f"{scripted_site}busy").status_code == 200
+    assert sleeps == [7.0]
+
+
+def test_retry_after_http_date_overrides_backoff(scripted_site, sleeps):
+    retry_at = formatdate(time.time() + 20, usegmt=True)
+    ScriptedHandler.script["/view/msdsoftmatter/busy"] = [(503, {"Retry-After": retry_at})]
+    engine = FetchEngine(rate=0, backoff=0.5)
+
+    assert engine.get(f"{scripted_site}busy").status_code == 200
+    assert len(sleeps) == 1
+    assert 18 <= sleeps[0] <= 20
+
+
+def test_retry_after_pauses_the_whole_host(scripted_site, sleeps):
+    ScriptedHandler.script["/view/msdsoftmatter/busy"] = [(429, {"Retry-After": "3"})]
+    engine = FetchEngine(rate=10, burst=1)
+
+    engine.get(f"{scripted_site}busy")
+
+    # The retry waited out the deferral on the host's bucket rather than sleeping in place
+    assert len(sleeps) == 1
+    assert 3.0 <= sleeps[0] <= 3.2
+    engine.get(f"{scripted_site}other")
+    assert len(sleeps) == 2
+
+
+def test_token_bucket_spaces_requests_per_host(sleeps):
+    limiter = HostRateLimiter(rate=10, burst=2)
+
+    for _ in range(5):
+        limiter.wait("http://a.example/page")
+    waits_on_a = list(sleeps)
+    for _ in range(2):
+        limiter.wait("http://b.example/page")
+
+    # Two banked tokens, then one token every 0.1 s, queued in arrival order
+    assert waits_on_a == pytest.approx([0.1, 0.2, 0.3], abs=0.01)
+    assert sleeps == waits_on_a
+
+
+def test_token_bucket_disabled_at_rate_zero(sleeps):
+    limiter = HostRateLimiter(rate=0)
+
+    for _ in range(10):
+        limiter.wait("http://a.example/page")
+
+    assert sleeps == []
+
+
+def test_map_keeps_input_order():
+    engine = FetchEngine(rate=0)
+    pages = list(range(20))
+
+    with serve_fixture_site(page_count=len(pages), latency=0.01) as start_url:
+        def fetch(page):
+            time.sleep((len(pages) - page) * 0.002)  # later pages finish first
+            return engine.get(f"{start_url}page-{page}").text
+
+        results = engine.map(fetch, pages, workers=8)
+
+    assert [f"<h1>Page {page}</h1>" in html for page, html in zip(pages, results)] == [True] * len(pages)
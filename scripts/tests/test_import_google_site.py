@@ -0,0 +1,204 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+import import_google_site
+from cache_index import CacheIndex, cache_filename, content_sha256
+from fetch_engine import FetchEngine
+from fixture_site import render_page, serve_handler, serve_recorded_site
+from html_backend import use_backend
+
+
+def test_filtered_slugs_are_not_journaled(tmp_path):
+    journal = import_google_site.RunJournal.start(tmp_path / "journal.jsonl", {})
+    # The URL's own slug is "contact", so the "about" target is filtered out
+    targets = [("about", f"{import_google_site.BASE_URL}/contact")]
+
+    failed = import_google_site.import_pages(targets, False, journal)
+
+    assert failed == []
+    assert journal.page_status("about") is None
+    assert journal.data["pages"] == {}
+
+
+def test_fetch_workers_follow_rate_limit_not_cpus():
+    assert import_google_site.fetch_workers(FetchEngine(rate=2.5, burst=2), image_workers=4) == 5
+    assert import_google_site.fetch_workers(FetchEngine(rate=20, burst=2), image_workers=4) == 22
+    assert import_google_site.fetch_workers(FetchEngine(rate=0), image_workers=4) == 4
+    assert import_google_site.fetch_workers(FetchEngine(rate=0.5, burst=1), image_workers=1) == 2
+
+
+class RevalidatingHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and answers a matching If-None-Match with 304."""
+
+    etag = '"v1"'
+    seen: list[str | None] = []
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.seen.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"<html><body><p>cached page</p></body></html>"
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+def test_stale_page_is_revalidated_and_304_reuses_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_google_site, "CACHE_DIR", tmp_path / "cache")
+    import_google_site.get_engine(rate=0)
+    RevalidatingHandler.seen = []
+
+    with serve_handler(RevalidatingHandler) as url:
+        first = import_google_site.fetch_with_cache(url)
+        index = import_google_site.get_cache_index()
+        entry = index.lookup(url)
+        index.record(url, fetched_at=time.time() - 3600, etag=entry["etag"],
+                     last_modified=entry["last_modified"], content_sha256=entry["content_sha256"])
+        second = import_google_site.fetch_with_cache(url, max_age=60)
+
+    assert second == first
+    assert RevalidatingHandler.seen == [None, '"v1"']
+    entry = CacheIndex(tmp_path / "cache").lookup(url)
+    assert entry["etag"] == '"v1"'
+    assert time.time() - entry["fetched_at"] < 60
+
+
+def test_legacy_sidecars_are_folded_into_the_index(tmp_path):
+    url = f"{import_google_site.BASE_URL}/research"
+    html = "<html><body>research</body></html>"
+    (tmp_path / cache_filename(url)).write_text(html, encoding="utf-8")
+    sidecar = tmp_path / cache_filename(url).replace(".html", ".json")
+    sidecar.write_text(json.dumps({"url": url, "etag": '"abc"', "last_modified": None, "fetched_at": 1.0}))
+    (tmp_path / "image-scan.json").write_text("{}")
+
+    entry = CacheIndex(tmp_path).lookup(url)
+
+    assert entry["etag"] == '"abc"' and entry["fetched_at"] == 1.0
+    assert entry["content_sha256"] == content_sha256(html)
+    assert not sidecar.exists()
+    assert (tmp_path / "image-scan.json").exists()
+
+
+def test_journal_appends_one_line_per_outcome_and_replays_on_resume(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    options = {"pages": None, "force": False, "max_age": None}
+    journal = import_google_site.RunJournal.start(path, options)
+    for index in range(3):
+        journal.record_image("research", f"https://lh3.example/{index}", f"/assets/img/imported/research/{index}")
+    journal.record_image("research", "https://lh3.example/bad", None, error="HTTP 500")
+    journal.record_page("research", f"{import_google_site.BASE_URL}/research", "partial", error="1 image(s) failed")
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"page": "contact", "sta')  # torn write from a killed run
+
+    resumed = import_google_site.RunJournal.resume(path, options)
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1 + 5 + 1
+    assert resumed.data["pages"] == journal.data["pages"]
+    assert resumed.data["images"] == journal.data["images"]
+    assert resumed.failed_images("research") == 1
+    assert resumed.page_status("contact") is None
+
+
+def test_resume_with_different_options_starts_a_new_run(tmp_path, capsys):
+    path = tmp_path / "journal.jsonl"
+    journal = import_google_site.RunJournal.start(path, {"pages": ["research"], "force": False, "max_age": None})
+    journal.record_page("research", f"{import_google_site.BASE_URL}/research", "done")
+
+    resumed = import_google_site.RunJournal.resume(path, {"pages": None, "force": True, "max_age": None})
+
+    assert resumed.page_status("research") is None
+    assert resumed.data["options"] == {"pages": None, "force": True, "max_age": None}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+    assert "starting a new run" in capsys.readouterr().out
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    """Point the importer at tmp_path and serve one recorded page; yield its URL."""
+    monkeypatch.setattr(import_google_site, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(import_google_site, "PAGES_DIR", tmp_path / "pages")
+    monkeypatch.setattr(import_google_site, "ASSETS_DIR", tmp_path / "assets")
+    monkeypatch.setattr(import_google_site, "_engine", None)
+    monkeypatch.setattr(import_google_site, "_cache_index", None)
+    monkeypatch.setattr(import_google_site, "_conversion_cache", None)
+    import_google_site.get_engine(rate=0)
+    with serve_recorded_site({"research": render_page(0, 2)}) as site_url:
+        yield f"{site_url}research"
+
+
+def import_research(url):
+    """Run one page through the importer; return how many times it was converted."""
+    conversions = []
+
+    def convert(*args):
+        conversions.append(args)
+        return import_google_site.convert_page(*args)
+
+    prepared = import_google_site.prepare_page(url, "research", force=False, convert=convert)
+    if prepared:
+        import_google_site.finish_page(url, "research", *prepared, force=False)
+    return len(conversions)
+
+
+def test_unchanged_page_skips_conversion(importer):
+    assert import_research(importer) == 1
+    written = (import_google_site.PAGES_DIR / "research.md").read_bytes()
+
+    assert import_research(importer) == 0
+    assert (import_google_site.PAGES_DIR / "research.md").read_bytes() == written
+
+
+def test_reconverted_page_keeps_last_imported(importer):
+    import_research(importer)
+    page = import_google_site.PAGES_DIR / "research.md"
+    earlier = import_google_site.LAST_IMPORTED_PATTERN.sub("last_imported: 2020-01-01T00:00:00Z", page.read_text())
+    page.write_text(earlier, encoding="utf-8")
+
+    # The edited file no longer matches the cached output hash, so the page is converted again
+    assert import_research(importer) == 1
+    assert page.read_text(encoding="utf-8") == earlier
+
+
+def test_converter_changes_invalidate_the_cache(importer, monkeypatch):
+    pytest.importorskip("lxml")
+    with use_backend("html.parser"):
+        assert import_research(importer) == 1
+        assert import_research(importer) == 0
+    with use_backend("lxml"):
+        assert import_research(importer) == 1
+
+    monkeypatch.setattr(import_google_site, "version", lambda package: "999.0")
+    assert import_research(importer) == 1
+    assert import_research(importer) == 0
+
+
+def test_pages_are_written_in_input_order(importer, monkeypatch, capsys):
+    slugs = ["alpha", "beta", "gamma", "delta"]
+    prepare = import_google_site.prepare_page
+
+    def slow_first_pages(url, slug, *args):
+        time.sleep(0.05 * (len(slugs) - slugs.index(slug)))  # the first page finishes last
+        return prepare(importer, slug, *args)
+
+    monkeypatch.setattr(import_google_site, "prepare_page", slow_first_pages)
+    monkeypatch.setattr(import_google_site, "slug_for_url", lambda url, root_slug: url.rsplit("/", 1)[1])
+    journal = import_google_site.RunJournal.start(import_google_site.CACHE_DIR / "journal.jsonl", {})
+    targets = [(slug, f"{import_google_site.BASE_URL}/{slug}") for slug in slugs]
+
+    failed = import_google_site.import_pages(targets, False, journal, image_workers=len(slugs))
+
+    assert failed == []
+    assert list(journal.data["pages"]) == slugs
+    printed = [line.removeprefix("Processing: ") for line in capsys.readouterr().out.splitlines()
+               if line.startswith("Processing: ")]
+    assert printed == slugs
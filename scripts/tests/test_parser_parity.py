@@ -0,0 +1,77 @@
+"""Every installed HTML backend must extract exactly what html.parser does.
+
+The corpus is the cached Google Sites pages when a mirror has been fetched,
+plus docs/reference-shots/home.html and synthetic fixture_site.py pages, so
+the check always runs offline.
+"""
+
+import re
+from pathlib import Path
+
+import pytest
+
+import crawl_inventory
+import extract_images
+import import_google_site
+from fixture_site import render_page
+from html_backend import available_backends, parse_html, select_attributes, use_backend
+from postprocess_mirror import MirrorPostprocessor
+
+ROOT = Path(__file__).resolve().parents[2]
+PAGE_URL = "https://sites.google.com/view/msdsoftmatter/home"
+FIXTURE_PAGES = 5
+
+
+def load_corpus() -> dict[str, str]:
+    corpus = {f"fixture-page-{index}": render_page(index, FIXTURE_PAGES) for index in range(FIXTURE_PAGES)}
+    for path in [ROOT / "docs/reference-shots/home.html", *sorted((ROOT / ".cache/google_site").glob("*.html"))]:
+        if path.exists():
+            corpus[str(path.relative_to(ROOT))] = path.read_text(encoding="utf-8")
+    return corpus
+
+
+def crawl_record(html, tmp_path):
+    page, assets, links = crawl_inventory.parse_page(PAGE_URL, html, crawl_inventory.START_URL)
+    return page, sorted(assets), links
+
+
+def markdown_record(html, tmp_path):
+    soup = parse_html(html)
+    title = import_google_site.extract_title(soup)
+    content_div = soup.find("div", class_=re.compile(r"sites-canvas-main")) or soup.body
+    if content_div is None:
+        return title, None
+    import_google_site.clean_html(content_div)
+    return title, import_google_site.html_to_markdown(content_div)
+
+
+def rewrite_record(html, tmp_path):
+    tmp_path.mkdir()
+    html_path = tmp_path / "page.html"
+    html_path.write_text(html, encoding="utf-8")
+    MirrorPostprocessor(tmp_path, tmp_path)._process_html_file(html_path)
+    return html_path.read_text(encoding="utf-8")
+
+
+CHECKS = {
+    "image-urls": lambda html, tmp_path: extract_images.extract_image_urls_from_html(html),
+    "crawl-page": crawl_record,
+    "nav-links": lambda html, tmp_path: select_attributes(html, [("a[href]", "href")]),
+    "markdown": markdown_record,
+    "mirror-rewrite": rewrite_record,
+}
+CORPUS = load_corpus()
+BACKENDS = available_backends()[1:] or [pytest.param("lxml", marks=pytest.mark.skip(reason="only html.parser installed"))]
+
+
+@pytest.mark.parametrize("check", CHECKS)
+@pytest.mark.parametrize("document", CORPUS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_matches_html_parser(backend, document, check, tmp_path):
+    html = CORPUS[document]
+    with use_backend("html.parser"):
+        baseline = CHECKS[check](html, tmp_path / "baseline")
+    with use_backend(backend):
+        result = CHECKS[check](html, tmp_path / backend)
+
+    assert result == baseline
@@ -0,0 +1,218 @@
+import json
+
+import pytest
+
+import postprocess_mirror
+from html_backend import select_attributes
+from postprocess_mirror import MANIFEST_NAME, MirrorPostprocessor
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(64)
+PAGE = (
+    '<html><head><link rel="stylesheet" href="../css/site.css"></head>'
+    '<body><img src="../images/logo.png"><a href="about.html">About</a></body></html>'
+)
+
+
+def write_mirror(raw_dir):
+    """A small wget-style mirror: two pages, a stylesheet and two images."""
+    site = raw_dir / "site"
+    (site / "pages").mkdir(parents=True)
+    (site / "images").mkdir()
+    (site / "css").mkdir()
+    (site / "pages" / "index.html").write_text(PAGE, encoding="utf-8")
+    (site / "pages" / "about.html").write_text('<html><body><img src="../images/team.png"></body></html>')
+    (site / "css" / "site.css").write_text('body { background: url("../images/logo.png"); }')
+    (site / "images" / "logo.png").write_bytes(PNG)
+    (site / "images" / "team.png").write_bytes(PNG + b"team")
+    return site
+
+
+def run(raw_dir, staging_dir, link_mode="copy", **kwargs):
+    processor = MirrorPostprocessor(raw_dir, staging_dir, link_mode=link_mode, **kwargs)
+    processor.run()
+    return processor
+
+
+def staged_files(staging_dir):
+    return {
+        str(path.relative_to(staging_dir)): path.read_bytes()
+        for path in sorted(staging_dir.rglob("*"))
+        if path.is_file() and path.name != MANIFEST_NAME
+    }
+
+
+def test_rerun_into_same_tree_reuses_every_file(tmp_path):
+    write_mirror(tmp_path / "raw")
+    first = run(tmp_path / "raw", tmp_path / "staging")
+    before = staged_files(tmp_path / "staging")
+    inodes = {path: (tmp_path / "staging" / path).stat().st_ino for path in before}
+
+    second = run(tmp_path / "raw", tmp_path / "staging")
+
+    assert second.reused == set(first.asset_map.values())
+    assert staged_files(tmp_path / "staging") == before
+    assert {path: (tmp_path / "staging" / path).stat().st_ino for path in before} == inodes
+
+
+def test_previous_run_redoes_only_changed_html(tmp_path):
+    site = write_mirror(tmp_path / "raw")
+    run(tmp_path / "raw", tmp_path / "first")
+    (site / "pages" / "about.html").write_text('<html><body><p>New</p><img src="../images/team.png"></body></html>')
+
+    second = run(tmp_path / "raw", tmp_path / "second", previous_dir=tmp_path / "first")
+
+    assert set(second.asset_map.values()) - second.reused == {"about.html"}
+    assert (tmp_path / "second" / "index.html").stat().st_ino == (tmp_path / "first" / "index.html").stat().st_ino
+    assert b"<p>New</p>" in (tmp_path / "second" / "about.html").read_bytes()
+    assert b'src="/images/team.png"' in (tmp_path / "second" / "about.html").read_bytes()
+    fresh = run(tmp_path / "raw", tmp_path / "fresh")
+    assert staged_files(tmp_path / "second") == staged_files(tmp_path / "fresh")
+    assert fresh.reused == set()
+
+
+def test_asset_map_change_redoes_all_html_and_css(tmp_path):
+    site = write_mirror(tmp_path / "raw")
+    run(tmp_path / "raw", tmp_path / "first")
+    (site / "images" / "new.png").write_bytes(PNG + b"new")
+
+    second = run(tmp_path / "raw", tmp_path / "second", previous_dir=tmp_path / "first")
+
+    assert second.reused == {"images/logo.png", "images/team.png"}
+    manifest = json.loads((tmp_path / "second" / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert "images/new.png" in manifest["outputs"]
+    assert staged_files(tmp_path / "second") == staged_files(run(tmp_path / "raw", tmp_path / "fresh").staging_dir)
+
+
+def raw_snapshot(raw_dir):
+    return {str(path.relative_to(raw_dir)): path.read_bytes() for path in sorted(raw_dir.rglob("*")) if path.is_file()}
+
+
+@pytest.mark.parametrize("link_mode", ["copy", "hardlink", "symlink"])
+def test_rewriting_staged_files_leaves_raw_untouched(tmp_path, link_mode):
+    write_mirror(tmp_path / "raw")
+    before = raw_snapshot(tmp_path / "raw")
+
+    processor = run(tmp_path / "raw", tmp_path / "staging", link_mode=link_mode)
+
+    assert raw_snapshot(tmp_path / "raw") == before
+    assert processor.link_mode == link_mode
+    for rewritten in ("index.html", "about.html", "css/site.css"):
+        staged = tmp_path / "staging" / rewritten
+        assert not staged.is_symlink()
+        assert staged.stat().st_nlink == 1
+    assert b"/images/logo.png" in (tmp_path / "staging" / "index.html").read_bytes()
+    staged_image = tmp_path / "staging" / "images" / "logo.png"
+    assert staged_image.read_bytes() == before["site/images/logo.png"]
+    assert staged_image.is_symlink() == (link_mode == "symlink")
+
+
+def test_automatic_link_mode_falls_back_to_copy(tmp_path, monkeypatch):
+    def unsupported(*args, **kwargs):
+        raise OSError("not supported on this filesystem")
+
+    monkeypatch.setattr(postprocess_mirror, "reflink", unsupported)
+    monkeypatch.setattr(postprocess_mirror.os, "link", unsupported)
+    write_mirror(tmp_path / "raw")
+
+    processor = run(tmp_path / "raw", tmp_path / "staging", link_mode=None)
+
+    assert processor.link_mode == "copy"
+    assert staged_files(tmp_path / "staging")["images/logo.png"] == PNG
+    assert not any(path.name.startswith(".link-probe-") for path in (tmp_path / "staging").iterdir())
+
+
+def test_failing_link_mode_switches_to_copy_mid_run(tmp_path, monkeypatch):
+    def unsupported(*args, **kwargs):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(postprocess_mirror.os, "link", unsupported)
+    write_mirror(tmp_path / "raw")
+    before = raw_snapshot(tmp_path / "raw")
+
+    processor = run(tmp_path / "raw", tmp_path / "staging", link_mode="hardlink")
+
+    assert processor.link_mode == "copy"
+    assert staged_files(tmp_path / "staging")["images/team.png"] == PNG + b"team"
+    assert raw_snapshot(tmp_path / "raw") == before
+
+
+LINK_QUERIES = [
+    ("a[href]", "href"),
+    ("link[href]", "href"),
+    ("script[src]", "src"),
+    ("img[src]", "src"),
+    ("img[srcset]", "srcset"),
+    ("div[data-src]", "data-src"),
+]
+ODD_PAGE = """<!DOCTYPE html>
+<HTML><head>
+<LINK REL=stylesheet HREF=../css/site.css>
+<script src="../js/app.js"></script>
+<script>document.write("<img src='../images/logo.png'>"); var a = "<a href=about.html>";</script>
+<!-- <img src="../images/team.png"> kept as written -->
+<style>body { background: url('../images/team.png') }</style>
+</head><body>
+<IMG   class=hero SRC="../images/logo.png" alt='Logo &amp; "mark"' >
+<img srcset="../images/logo.png 1x,../images/team.png 2x" src=../images/team.png>
+<a href="about.html?tab=1&amp;view=full#team" title="a > b">About</a>
+<a href='https://example.org/images/logo.png'>External</a>
+<div data-src="../images/team.png" data-label="not.a link here"><p>Unclosed<br/></div>
+</body></HTML>
+"""
+
+
+def write_odd_mirror(raw_dir):
+    site = write_mirror(raw_dir)
+    (site / "js").mkdir()
+    (site / "js" / "app.js").write_text("console.log('app');")
+    (site / "pages" / "index.html").write_text(ODD_PAGE, encoding="utf-8")
+    return site
+
+
+def test_splice_and_soup_rewrite_the_same_links(tmp_path):
+    write_odd_mirror(tmp_path / "raw")
+    run(tmp_path / "raw", tmp_path / "splice", rewrite_mode="splice")
+    run(tmp_path / "raw", tmp_path / "soup", rewrite_mode="soup")
+
+    spliced = (tmp_path / "splice" / "index.html").read_text(encoding="utf-8")
+    souped = (tmp_path / "soup" / "index.html").read_text(encoding="utf-8")
+
+    assert select_attributes(spliced, LINK_QUERIES) == select_attributes(souped, LINK_QUERIES)
+    assert select_attributes(spliced, LINK_QUERIES)[3] == ["/images/logo.png", "/images/team.png"]
+
+
+def test_splice_changes_only_link_values(tmp_path):
+    write_odd_mirror(tmp_path / "raw")
+    run(tmp_path / "raw", tmp_path / "staging")
+
+    expected = (
+        ODD_PAGE
+        .replace("HREF=../css/site.css", 'HREF="/css/site.css"')
+        .replace('src="../js/app.js"', 'src="/js/app.js"')
+        .replace("url('../images/team.png')", 'url("/images/team.png")')
+        .replace('SRC="../images/logo.png"', 'SRC="/images/logo.png"')
+        .replace('srcset="../images/logo.png 1x,../images/team.png 2x" src=../images/team.png',
+                 'srcset="/images/logo.png 1x, /images/team.png 2x" src="/images/team.png"')
+        .replace('href="about.html?tab=1&amp;view=full#team"', 'href="/about.html?tab=1&amp;view=full#team"')
+        .replace('data-src="../images/team.png"', 'data-src="/images/team.png"')
+    )
+    assert (tmp_path / "staging" / "index.html").read_bytes() == expected.encode("utf-8")
+
+
+def test_splice_leaves_script_bodies_and_comments_alone(tmp_path):
+    write_odd_mirror(tmp_path / "raw")
+    run(tmp_path / "raw", tmp_path / "staging")
+
+    staged = (tmp_path / "staging" / "index.html").read_text(encoding="utf-8")
+    assert """document.write("<img src='../images/logo.png'>"); var a = "<a href=about.html>";""" in staged
+    assert '<!-- <img src="../images/team.png"> kept as written -->' in staged
+
+
+def test_untouched_pages_are_not_rewritten(tmp_path):
+    site = write_mirror(tmp_path / "raw")
+    untouched = '<p class=x>No <b>links</b> &amp; odd   spacing<br/>\n<a href="#top">Top</a></p>'
+    (site / "pages" / "plain.html").write_text(untouched, encoding="utf-8")
+
+    run(tmp_path / "raw", tmp_path / "staging")
+
+    assert (tmp_path / "staging" / "plain.html").read_text(encoding="utf-8") == untouched
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+
+import reorganize_images
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def test_nested_directory_in_page_folder_is_skipped(tmp_path):
+    page_dir = tmp_path / "imported" / "research"
+    (page_dir / "thumbnails").mkdir(parents=True)
+    (page_dir / "thumbnails" / "nested.png").write_bytes(PNG + b"nested")
+    (page_dir / "diagram.png").write_bytes(PNG + b"diagram")
+
+    manifest = reorganize_images.main(tmp_path)
+
+    assert [image["original_filename"] for image in manifest["images"]] == ["diagram.png"]
+    assert manifest["invalid_files"] == []
+
+
+def test_generic_image_formats_are_kept_and_unknown_files_logged(tmp_path, capsys):
+    page_dir = tmp_path / "imported" / "facilities"
+    page_dir.mkdir(parents=True)
+    (page_dir / "scan").write_bytes(b"II*\x00" + bytes(16))
+    (page_dir / "bitmap").write_bytes(b"BM" + bytes(16))
+    (page_dir / "blob").write_bytes(b"\x00garbage")
+
+    manifest = reorganize_images.main(tmp_path)
+
+    assert sorted(image["new_filename"] for image in manifest["images"]) == ["bitmap.bmp", "scan.tif"]
+    assert [invalid["reason"] for invalid in manifest["invalid_files"]] == ["Unrecognized file format"]
+    assert f"Skipping {page_dir / 'blob'}: unrecognized file format" in capsys.readouterr().out
+
+
+def test_base_dir_is_a_command_line_argument(tmp_path):
+    page_dir = tmp_path / "imported" / "home"
+    page_dir.mkdir(parents=True)
+    (page_dir / "logo.png").write_bytes(PNG + b"logo")
+
+    subprocess.run(
+        [sys.executable, reorganize_images.__file__, "--base-dir", str(tmp_path)],
+        check=True, capture_output=True, cwd=tmp_path,
+    )
+
+    assert (tmp_path / "general" / "logo.png").read_bytes() == PNG + b"logo"
+    assert json.loads((tmp_path / "image-manifest.json").read_text())["summary"]["total_images"] == 1